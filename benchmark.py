@@ -0,0 +1,263 @@
+"""
+BANCS D'ESSAI DE PERFORMANCE
+============================
+
+Mesure le débit (lignes/s), la mémoire de pointe et l'évolution avec la
+taille des données de :
+- chaque stratégie de `stats_library.strategies` (1 et 2 colonnes) ; le
+  temps des corrélations de rang (Spearman, Kendall) est rapporté à
+  celui de `Correlation` ;
+- le chargement CSV (`charger_csv`, `charger_csv_parallele`, cache binaire) ;
+- `JournalCalculs.enregistrer`.
+
+Avant les mesures, chaque moteur de calcul est comparé à la référence
+Python (`verifier_backends`) ; `--backend` impose un moteur.
+
+Les résultats sont enregistrés en JSON. Avec `--reference`, ils sont
+comparés à une exécution précédente et le script échoue (code 1) si un
+débit a baissé de plus de `--tolerance`.
+
+Exemples :
+    python benchmark.py --max-puissance 6 --sortie bench.json
+    python benchmark.py --reference bench.json --tolerance 0.2
+    python benchmark.py --backend tableau
+"""
+
+import argparse
+import inspect
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import stats_library
+from stats_library import strategies
+from stats_library.backends import backend_actif, definir_backend, verifier_backends
+from stats_library.core import JournalCalculs, MethodeStatistique
+from stats_library.donnees import Colonnes
+from stats_library.chargement import charger_csv, charger_csv_parallele
+
+# Paramètres des stratégies dont le constructeur exige des arguments
+PARAMETRES = {
+    "Quantile": ([0.25, 0.5, 0.75],),
+}
+# Au-delà, les mesures de mémoire (tracemalloc) deviennent trop lentes
+MAX_LIGNES_MEMOIRE = 10 ** 6
+# Écart relatif toléré entre un moteur de calcul et la référence
+TOLERANCE_BACKENDS = 1e-9
+
+
+def strategies_disponibles():
+    """Instancie chaque stratégie concrète définie dans `strategies`."""
+    methodes = []
+    for nom, classe in inspect.getmembers(strategies, inspect.isclass):
+        if (not issubclass(classe, MethodeStatistique) or inspect.isabstract(classe)
+                or classe.__module__ != strategies.__name__):
+            continue
+        try:
+            methodes.append(classe(*PARAMETRES.get(nom, ())))
+        except TypeError:
+            print(f"  [IGNORÉE] {nom} : paramètres requis inconnus")
+    return methodes
+
+
+def generer(n, largeur, graine=0):
+    """Jeu de données synthétique : x gaussien, y = 2x + bruit."""
+    aleatoire = random.Random(graine)
+    x = [aleatoire.gauss(50, 10) for _ in range(n)]
+    if largeur == 1:
+        return Colonnes([x])
+    return Colonnes([x, [2 * v + aleatoire.gauss(0, 5) for v in x]])
+
+
+def ecrire_csv(donnees, chemin):
+    with open(chemin, "w", encoding="utf-8") as f:
+        f.write(",".join(donnees.noms) + "\n")
+        if donnees.largeur == 1:
+            f.writelines(f"{v}\n" for v in donnees.colonne(0))
+        else:
+            f.writelines(f"{x},{y}\n" for x, y in donnees)
+
+
+def mesurer(fonction, repetitions, memoire=True):
+    """Meilleur temps sur `repetitions` appels, et mémoire de pointe d'un appel."""
+    meilleur = math.inf
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    pic = None
+    if memoire:
+        tracemalloc.start()
+        fonction()
+        _, pic = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return meilleur, pic
+
+
+def pente(points):
+    """Exposant de la loi de puissance temps ~ n^k (régression log-log)."""
+    points = [(math.log(n), math.log(t)) for n, t in points if t > 0]
+    if len(points) < 2:
+        return None
+    mx = sum(p[0] for p in points) / len(points)
+    my = sum(p[1] for p in points) / len(points)
+    num = sum((x - mx) * (y - my) for x, y in points)
+    den = sum((x - mx) ** 2 for x, _ in points)
+    return num / den if den else None
+
+
+def executer(tailles, repetitions, processus):
+    resultats = []
+    journal = JournalCalculs()
+    methodes = strategies_disponibles()
+
+    def ajouter(nom, largeur, n, secondes, pic):
+        resultats.append({
+            "nom": nom,
+            "colonnes": largeur,
+            "lignes": n,
+            "secondes": secondes,
+            "lignes_par_seconde": n / secondes if secondes else None,
+            "memoire_pic": pic,
+        })
+        pic_texte = f"{pic / 1e6:9.2f} Mo" if pic is not None else "        -"
+        print(f"  {nom:28} {largeur} col. {n:>10} lignes "
+              f"{secondes:10.5f} s {n / secondes if secondes else 0:14.0f} l/s {pic_texte}")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        for largeur in (1, 2):
+            for n in tailles:
+                donnees = generer(n, largeur)
+                memoire = n <= MAX_LIGNES_MEMOIRE
+
+                for methode in methodes:
+                    if methode.dimension > largeur:
+                        continue
+                    secondes, pic = mesurer(lambda: methode.calculer(donnees), repetitions, memoire)
+                    ajouter(methode.__class__.__name__, largeur, n, secondes, pic)
+
+                chemin = os.path.join(dossier, f"donnees_{largeur}_{n}.csv")
+                ecrire_csv(donnees, chemin)
+                secondes, pic = mesurer(lambda: charger_csv(chemin), repetitions, memoire)
+                ajouter("charger_csv", largeur, n, secondes, pic)
+                secondes, pic = mesurer(lambda: charger_csv_parallele(chemin, processus),
+                                        repetitions, memoire=False)
+                ajouter("charger_csv_parallele", largeur, n, secondes, pic)
+                charger_csv(chemin, cache=True)
+                secondes, pic = mesurer(lambda: charger_csv(chemin, cache=True), repetitions, memoire)
+                ajouter("charger_csv_cache", largeur, n, secondes, pic)
+                os.remove(chemin)
+
+        for n in tailles:
+            def enregistrer():
+                for _ in range(n):
+                    journal.enregistrer("Moyenne", 1.0)
+            secondes, pic = mesurer(enregistrer, repetitions, n <= MAX_LIGNES_MEMOIRE)
+            ajouter("JournalCalculs.enregistrer", 0, n, secondes, pic)
+        journal.vider()
+
+    courbes = {}
+    for r in resultats:
+        courbes.setdefault(f"{r['nom']}/{r['colonnes']}", []).append((r["lignes"], r["secondes"]))
+    return {
+        "version": stats_library.__version__,
+        "python": sys.version.split()[0],
+        "plateforme": platform.platform(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "backend": backend_actif(),
+        "resultats": resultats,
+        "pentes": {cle: pente(points) for cle, points in courbes.items()},
+    }
+
+
+def rapports_rangs(resultats):
+    """{(méthode, lignes): temps / temps de Correlation} pour les corrélations de rang."""
+    pearson = {r["lignes"]: r["secondes"] for r in resultats if r["nom"] == "Correlation"}
+    return {(r["nom"], r["lignes"]): r["secondes"] / pearson[r["lignes"]]
+            for r in resultats
+            if r["nom"] in ("Spearman", "Kendall") and pearson.get(r["lignes"])}
+
+
+def comparer(actuel, reference, tolerance):
+    """Liste des mesures dont le débit a baissé de plus de `tolerance`."""
+    anciens = {(r["nom"], r["colonnes"], r["lignes"]): r for r in reference["resultats"]}
+    regressions = []
+    for r in actuel["resultats"]:
+        ancien = anciens.get((r["nom"], r["colonnes"], r["lignes"]))
+        if not ancien or not ancien["lignes_par_seconde"] or not r["lignes_par_seconde"]:
+            continue
+        rapport = r["lignes_par_seconde"] / ancien["lignes_par_seconde"]
+        if rapport < 1 - tolerance:
+            regressions.append((r["nom"], r["colonnes"], r["lignes"], rapport))
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Bancs d'essai de stats_library")
+    parser.add_argument("--min-puissance", type=int, default=3,
+                        help="plus petite taille : 10^N lignes (défaut : 3)")
+    parser.add_argument("--max-puissance", type=int, default=6,
+                        help="plus grande taille : 10^N lignes (défaut : 6, jusqu'à 7)")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--processus", type=int, default=None)
+    parser.add_argument("--sortie", default="bench.json")
+    parser.add_argument("--reference", help="résultats JSON d'une version précédente")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="baisse de débit tolérée avant échec (défaut : 0.2)")
+    parser.add_argument("--backend", default="auto",
+                        help="moteur de calcul imposé : auto, python, tableau, numpy")
+    options = parser.parse_args(arguments)
+    try:
+        definir_backend(options.backend)
+    except ValueError as e:
+        parser.error(str(e))
+    # Les processus de travail lisent le moteur dans l'environnement
+    os.environ["STATS_BACKEND"] = options.backend
+
+    print("Cohérence des moteurs de calcul avec la référence :")
+    ecarts = verifier_backends()
+    for nom, ecart in ecarts.items():
+        print(f"  {nom:10} écart relatif max = {ecart:.2e}")
+    if any(ecart > TOLERANCE_BACKENDS for ecart in ecarts.values()):
+        print("[ÉCHEC] Un moteur de calcul diverge de la référence.")
+        return 1
+
+    tailles = [10 ** p for p in range(options.min_puissance, options.max_puissance + 1)]
+    print(f"\nBancs d'essai stats_library {stats_library.__version__} "
+          f"(moteur {backend_actif()}) : tailles {tailles}")
+    actuel = executer(tailles, options.repetitions, options.processus)
+
+    with open(options.sortie, "w", encoding="utf-8") as f:
+        json.dump(actuel, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats enregistrés dans '{options.sortie}'")
+
+    print("\nÉvolution du temps avec la taille (temps ~ n^k) :")
+    for cle, k in sorted(actuel["pentes"].items()):
+        if k is not None:
+            print(f"  {cle:32} k = {k:.2f}")
+
+    print("\nCorrélations de rang (temps rapporté à Correlation) :")
+    for (nom, n), rapport in sorted(rapports_rangs(actuel["resultats"]).items()):
+        print(f"  {nom:10} {n:>10} lignes  × {rapport:.1f}")
+
+    if options.reference:
+        with open(options.reference, encoding="utf-8") as f:
+            reference = json.load(f)
+        regressions = comparer(actuel, reference, options.tolerance)
+        if regressions:
+            print(f"\n[ÉCHEC] {len(regressions)} régression(s) de performance :")
+            for nom, largeur, n, rapport in regressions:
+                print(f"  {nom} ({largeur} col., {n} lignes) : débit × {rapport:.2f}")
+            return 1
+        print("\n[OK] Aucune régression de performance.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,6 @@ Ce script démontre toutes les fonctionnalités de la bibliothèque d'analyse st
 - Gestion des erreurs
 """
 
-import csv
 import time
 from stats_library.strategies import (
     Analyseur,
@@ -21,40 +20,22 @@ from stats_library.strategies import (
     RegressionLineaire
 )
 from stats_library.core import JournalCalculs
+from stats_library.chargement import charger_csv
 
 
 def charger_donnees(filepath):
     """Charge les données depuis un fichier CSV."""
-    donnees = []
     try:
-        with open(filepath, mode="r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            next(reader, None)  # ignorer en-tête si présent
-            for row in reader:
-                if not row or all(not cell.strip() for cell in row):
-                    continue
-                if len(row) >= 2:
-                    try:
-                        donnees.append((float(row[0]), float(row[1])))
-                    except ValueError:
-                        continue
-                elif len(row) == 1 and row[0].strip():
-                    try:
-                        donnees.append(float(row[0]))
-                    except ValueError:
-                        continue
+        return charger_csv(filepath)
     except FileNotFoundError:
         print(f" Fichier '{filepath}' introuvable.")
         return None
+    except ValueError:
+        print(f" Aucune donnée valide dans '{filepath}'.")
+        return None
     except Exception as e:
         print(f" Erreur lors du chargement : {e}")
         return None
-    
-    if not donnees:
-        print(f" Aucune donnée valide dans '{filepath}'.")
-        return None
-    
-    return donnees
 
 
 def afficher_separateur(titre):
@@ -93,7 +74,7 @@ def demonstration():
         print(f" {len(donnees_paires)} paires chargées")
         print(f"   Premières paires : {donnees_paires[:3]}...")
         # Extraire les valeurs simples pour les méthodes univariées
-        donnees_simples_2 = [d[0] for d in donnees_paires]
+        donnees_simples_2 = donnees_paires.selectionner(0)
     
     time.sleep(1)
     
@@ -103,7 +84,7 @@ def demonstration():
     afficher_separateur("DÉMONSTRATION 2 : Méthodes statistiques univariées")
     
     if donnees_simples:
-        print(f"\n Analyse des données : {donnees_simples}")
+        print(f"\n Analyse des données : {list(donnees_simples)}")
         print(f"   Nombre de valeurs : {len(donnees_simples)}\n")
         
         # Moyenne
@@ -146,7 +127,7 @@ def demonstration():
     afficher_separateur("DÉMONSTRATION 3 : Méthodes statistiques bivariées")
     
     if donnees_paires:
-        print(f"\n Analyse des paires : {donnees_paires}")
+        print(f"\n Analyse des paires : {list(donnees_paires)}")
         print(f"   Nombre de paires : {len(donnees_paires)}\n")
         
         # Corrélation
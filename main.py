@@ -1,51 +1,76 @@
-import csv
-from stats_library.strategies import (
-    Analyseur,
-    Moyenne,
-    Mediane,
-    EcartType,
-    Correlation,
-    RegressionLineaire
-)
+import os
+import signal
+
+from stats_library.annulation import ANNULE, EXPIRE, JetonAnnulation
+from stats_library.strategies import Analyseur, RegressionLineaire
 from stats_library.core import JournalCalculs
+from stats_library.chargement import charger_csv
+from stats_library.cache_resultats import CacheResultats
+from stats_library.registre import REGISTRE, capacites
+from stats_library.echantillonnage import echantillonner_csv
+
+# Au-delà de cette taille, un échantillon est proposé au chargement
+SEUIL_ECHANTILLON = 64 * 1024 * 1024
+# Au-delà de ce nombre de lignes, la progression du calcul est affichée
+SEUIL_PROGRESSION = 1000000
 
 
 # ==========================
 # Chargement des données CSV
 # ==========================
-def charger_donnees(filepath):
-    donnees = []
+def charger_donnees(filepath, largeur_max=2, echantillon=None):
+    """
+    Charge le fichier entier, ou un échantillon de `echantillon` lignes.
+
+    Retourne (données, informations d'échantillonnage ou None), ou
+    (None, None) en cas d'erreur. L'échantillon est tiré avec une graine
+    fixe : les mêmes lignes sont retenues quelle que soit `largeur_max`.
+    """
     try:
-        with open(filepath, mode="r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            next(reader, None)  # ignorer en-tête si présent
-            for row in reader:
-                # Ignorer les lignes vides
-                if not row or all(not cell.strip() for cell in row):
-                    continue
-                # Traiter les lignes avec données
-                if len(row) >= 2:
-                    try:
-                        donnees.append((float(row[0]), float(row[1])))
-                    except ValueError:
-                        continue  # Ignorer les lignes avec valeurs non numériques
-                elif len(row) == 1 and row[0].strip():
-                    try:
-                        donnees.append(float(row[0]))
-                    except ValueError:
-                        continue  # Ignorer les lignes avec valeurs non numériques
+        if echantillon:
+            donnees, infos = echantillonner_csv(filepath, echantillon, graine=0,
+                                                largeur_max=largeur_max)
+            print(f"[INFO] Échantillon de {infos['taille_echantillon']} lignes "
+                  f"sur ~{infos['lignes_estimees']}")
+            return donnees, infos
+        return charger_csv(filepath, cache=True, largeur_max=largeur_max), None
     except FileNotFoundError:
         print(f"[ERREUR] Fichier '{filepath}' introuvable.")
-        return None
+        return None, None
+    except ValueError as e:
+        print(f"[ERREUR] {e}")
+        return None, None
     except Exception as e:
         print(f"[ERREUR] Problème lors du chargement : {e}")
-        return None
-    
-    if not donnees:
-        print("[ERREUR] Aucune donnée valide trouvée dans le fichier.")
-        return None
-    
-    return donnees
+        return None, None
+
+
+# ==========================
+# Calcul interruptible
+# ==========================
+def afficher_progression(lignes, total):
+    print(f"\r  Calcul : {100 * lignes // total:3d} % (Ctrl+C pour interrompre)", end="", flush=True)
+
+
+def calculer_interruptible(analyseur, donnees):
+    """
+    Exécute la méthode courante ; Ctrl+C annule le calcul proprement
+    (entre deux blocs) au lieu d'arrêter le programme.
+    Retourne (résultat, statut) : statut None, ou "ANNULE". Le statut est
+    celui que le calcul a journalisé : un Ctrl+C arrivé après le dernier
+    bloc n'interrompt rien, le résultat est alors complet.
+    """
+    jeton = JetonAnnulation()
+    precedent = signal.signal(signal.SIGINT, lambda *_: jeton.annuler())
+    progression = afficher_progression if len(donnees) >= SEUIL_PROGRESSION else None
+    try:
+        resultat = analyseur.executer_analyse(donnees, progression=progression, jeton=jeton)
+    finally:
+        signal.signal(signal.SIGINT, precedent)
+        if progression is not None:
+            print()
+    statut = JournalCalculs().derniere_entree()["status"]
+    return resultat, statut if statut in (ANNULE, EXPIRE) else None
 
 
 # ==========================
@@ -63,39 +88,45 @@ def afficher_menu():
     print("=" * 60)
 
 
-def afficher_methodes():
+def afficher_methodes(entrees):
     print("\nMéthodes statistiques disponibles :")
-    print("1 - Moyenne")
-    print("2 - Médiane")
-    print("3 - Écart-Type")
-    print("4 - Corrélation (2 colonnes)")
-    print("5 - Régression Linéaire (2 colonnes)")
+    for i, entree in enumerate(entrees, 1):
+        try:
+            c = entree.capacites
+        except (ImportError, AttributeError, TypeError) as e:
+            print(f"{i} - {entree.libelle} [indisponible : {e}]")
+            continue
+        precision = " (2 colonnes ou plus)" if c["toutes_colonnes"] else " (2 colonnes)" if c["paires"] else ""
+        print(f"{i} - {entree.libelle}{precision}")
 
 
 def choisir_methode():
-    afficher_methodes()
+    entrees = REGISTRE.entrees()
+    afficher_methodes(entrees)
     choix = input("Votre choix : ").strip()
-    methodes = {
-        "1": Moyenne(),
-        "2": Mediane(),
-        "3": EcartType(),
-        "4": Correlation(),
-        "5": RegressionLineaire()
-    }
-    return methodes.get(choix), choix
+    if not choix.isdigit() or not 1 <= int(choix) <= len(entrees):
+        return None
+    # Seule la méthode choisie est instanciée (les capacités sont lues sur les classes)
+    try:
+        return entrees[int(choix) - 1].creer()
+    except (ImportError, AttributeError, TypeError) as e:
+        print(f"[ERREUR] Méthode indisponible : {e}")
+        return None
 
 
 # ==========================
 # Programme principal
 # ==========================
 def main():
-    analyseur = Analyseur()
+    analyseur = Analyseur(cache=CacheResultats())
     journal = JournalCalculs()
 
     donnees_chargees = None
     donnees_simples = None
     donnees_paires = None
     fichier_actuel = None
+    taille_echantillon = None
+    infos_echantillon = None
 
     print("Bienvenue dans la Bibliotheque d'Analyse Statistique !")
 
@@ -109,16 +140,25 @@ def main():
             if not fichier:
                 fichier = "data.csv"
 
-            donnees = charger_donnees(fichier)
+            echantillon = None
+            if os.path.isfile(fichier) and os.path.getsize(fichier) >= SEUIL_ECHANTILLON:
+                reponse = input("Fichier volumineux : taille d'échantillon "
+                                "(Entrée = fichier complet) : ").strip()
+                if reponse.isdigit() and int(reponse) > 0:
+                    echantillon = int(reponse)
+
+            donnees, infos = charger_donnees(fichier, echantillon=echantillon)
             if donnees is None:
                 continue
 
             donnees_chargees = donnees
             fichier_actuel = fichier
+            taille_echantillon = echantillon
+            infos_echantillon = infos
 
-            if isinstance(donnees[0], tuple):
+            if donnees.largeur >= 2:
                 donnees_paires = donnees
-                donnees_simples = [d[0] for d in donnees]
+                donnees_simples = donnees.selectionner(0)
                 print(f"[OK] {len(donnees)} paires chargées depuis '{fichier}'")
             else:
                 donnees_simples = donnees
@@ -134,13 +174,14 @@ def main():
                 print("Charger d'abord des données.")
                 continue
 
-            methode, num_methode = choisir_methode()
+            methode = choisir_methode()
             if methode is None:
                 print("Choix de méthode invalide.")
                 continue
+            capacites_methode = capacites(methode)
 
             # ⚠️ Cas méthodes nécessitant (X,Y)
-            if num_methode in ["4", "5"] and donnees_paires is None:
+            if capacites_methode["paires"] and donnees_paires is None:
                 message = "Cette méthode nécessite des paires (X,Y)"
                 print(f"[ERREUR] {message}")
 
@@ -152,16 +193,37 @@ def main():
                 continue
 
             donnees_a_utiliser = (
-                donnees_paires if num_methode in ["4", "5"] else donnees_simples
+                donnees_paires if capacites_methode["paires"] else donnees_simples
             )
+            infos_a_utiliser = infos_echantillon
+            if capacites_methode["toutes_colonnes"]:
+                # Méthode multivariée : relire toutes les colonnes du fichier
+                # (pour un échantillon, les mêmes lignes)
+                donnees_a_utiliser, infos_a_utiliser = charger_donnees(
+                    fichier_actuel, largeur_max=None, echantillon=taille_echantillon)
+                if donnees_a_utiliser is None:
+                    continue
 
             try:
-                analyseur.set_methode(methode)
-                resultat = analyseur.executer_analyse(donnees_a_utiliser)
-
-                print(f"[RESULTAT] {methode.__class__.__name__} : {resultat}")
-
-                if num_methode == "5":
+                if taille_echantillon:
+                    # Analyse approchée de l'échantillon chargé, avec erreur type
+                    approche, = analyseur.executer_approximatif(
+                        [methode], fichier_actuel, graine=0,
+                        echantillon=(donnees_a_utiliser, infos_a_utiliser))
+                    resultat = approche["resultat"]
+                    print(f"[RESULTAT] {methode.__class__.__name__} ≈ {resultat} "
+                          f"(erreur type {approche['erreur_type']}, "
+                          f"échantillon de {approche['taille_echantillon']} lignes "
+                          f"sur ~{approche['lignes_estimees']})")
+                else:
+                    analyseur.set_methode(methode)
+                    resultat, statut = calculer_interruptible(analyseur, donnees_a_utiliser)
+                    if statut:
+                        print(f"[{statut}] Calcul interrompu ; résultat partiel : {resultat}")
+                        continue
+                    print(f"[RESULTAT] {methode.__class__.__name__} : {resultat}")
+
+                if isinstance(methode, RegressionLineaire):
                     a, b = resultat
                     print(f"Équation : y = {a:.4f}x + {b:.4f}")
 
@@ -191,9 +253,11 @@ def main():
                 print("\nJournal des calculs :")
                 print("-" * 60)
                 for i, log in enumerate(logs, 1):
+                    approche = (f" (approximatif, n={log['taille_echantillon']})"
+                                if log.get("approximatif") else "")
                     print(
                         f"{i}. [{log['date']}] {log['methode']} "
-                        f"| {log['status']} → {log['resultat']}"
+                        f"| {log['status']}{approche} → {log['resultat']}"
                     )
                 print("-" * 60)
 
@@ -8,22 +8,80 @@ pour fournir une bibliothèque modulaire d'analyse statistique.
 from stats_library.core import MethodeStatistique, JournalCalculs
 from stats_library.strategies import (
     Analyseur,
+    PlanExecution,
+    MethodeParMoments,
+    MethodeParRangs,
     Moyenne,
     Mediane,
+    Quantile,
     EcartType,
     Correlation,
-    RegressionLineaire
+    Spearman,
+    Kendall,
+    RegressionLineaire,
+    MatriceCovariance,
+    MatriceCorrelation,
+    RegressionMultiple
 )
+from stats_library.fenetres import (
+    MoyenneGlissante,
+    EcartTypeGlissant,
+    MedianeGlissante,
+    CorrelationGlissante
+)
+from stats_library.donnees import Colonnes, ColonneCategorielle, regrouper
+from stats_library.cache_resultats import CacheResultats
+from stats_library.registre import REGISTRE, capacites
+from stats_library.reechantillonnage import Bootstrap, TestPermutation
+from stats_library.annulation import JetonAnnulation
+from stats_library.puits_journal import PuitsJSONL, PuitsSQLite
+from stats_library.dialecte import Dialecte, detecter_dialecte
+from stats_library.chargement import (
+    charger_csv,
+    charger_csv_parallele,
+    lire_csv_par_blocs
+)
+from stats_library.echantillonnage import echantillonner_csv
 
 __all__ = [
     'MethodeStatistique',
     'JournalCalculs',
     'Analyseur',
+    'PlanExecution',
+    'MethodeParMoments',
+    'MethodeParRangs',
     'Moyenne',
     'Mediane',
+    'Quantile',
     'EcartType',
     'Correlation',
-    'RegressionLineaire'
+    'Spearman',
+    'Kendall',
+    'RegressionLineaire',
+    'MatriceCovariance',
+    'MatriceCorrelation',
+    'RegressionMultiple',
+    'MoyenneGlissante',
+    'EcartTypeGlissant',
+    'MedianeGlissante',
+    'CorrelationGlissante',
+    'Colonnes',
+    'ColonneCategorielle',
+    'regrouper',
+    'CacheResultats',
+    'REGISTRE',
+    'capacites',
+    'Bootstrap',
+    'TestPermutation',
+    'JetonAnnulation',
+    'PuitsJSONL',
+    'PuitsSQLite',
+    'Dialecte',
+    'detecter_dialecte',
+    'charger_csv',
+    'charger_csv_parallele',
+    'lire_csv_par_blocs',
+    'echantillonner_csv'
 ]
 
 __version__ = '1.0.0'
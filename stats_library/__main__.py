@@ -0,0 +1,4 @@
+import sys
+from stats_library.cli import main
+
+sys.exit(main())
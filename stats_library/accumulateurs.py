@@ -0,0 +1,166 @@
+"""
+Accumulateurs partagés entre stratégies.
+
+`Moments` regroupe en un seul passage tout ce dont ont besoin la
+moyenne, l'écart-type, la corrélation et la régression linéaire :
+effectif, moyennes, sommes des carrés des écarts et co-moment.
+Les données sont lues par blocs ; chaque bloc est centré sur sa propre
+moyenne puis combiné à l'état courant (formules de Chan et al.), ce qui
+évite l'annulation numérique de la forme nΣx² - (Σx)².
+
+`Gram` généralise ces moments à k variables (moyennes et matrice des
+co-moments centrés).
+
+Le calcul de chaque bloc est délégué au moteur choisi par
+`stats_library.backends` (Python, tampons `array`, NumPy).
+"""
+
+from stats_library.backends import choisir_backend
+
+TAILLE_BLOC = 65536
+
+
+class Moments:
+    """Moments d'ordre 1 et 2 d'une ou deux variables."""
+    __slots__ = ("n", "moyenne_x", "moyenne_y", "m2_x", "m2_y", "c_xy")
+
+    def __init__(self):
+        self.n = 0
+        self.moyenne_x = 0.0
+        self.moyenne_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    @classmethod
+    def depuis_colonnes(cls, x, y=None):
+        """Calcule les moments de colonnes entières, bloc par bloc."""
+        return cls().ajouter_colonnes(x, y)
+
+    def ajouter_colonnes(self, x, y=None):
+        """Intègre des colonnes de taille quelconque, par blocs de `TAILLE_BLOC`."""
+        for debut in range(0, len(x), TAILLE_BLOC):
+            fin = debut + TAILLE_BLOC
+            self.ajouter_bloc(x[debut:fin], None if y is None else y[debut:fin])
+        return self
+
+    def ajouter_bloc(self, x, y=None):
+        """Intègre un bloc de valeurs (et ses valeurs y associées)."""
+        n_b = len(x)
+        if n_b == 0:
+            return self
+        autre = Moments()
+        (autre.n, autre.moyenne_x, autre.moyenne_y,
+         autre.m2_x, autre.m2_y, autre.c_xy) = choisir_backend(x).moments(x, y)
+        return self.fusionner(autre)
+
+    def ajouter_valeur(self, x, y=0.0):
+        """Ajoute une seule observation (mise à jour de Welford, O(1))."""
+        self.n += 1
+        dx = x - self.moyenne_x
+        dy = y - self.moyenne_y
+        self.moyenne_x += dx / self.n
+        self.moyenne_y += dy / self.n
+        self.m2_x += dx * (x - self.moyenne_x)
+        self.m2_y += dy * (y - self.moyenne_y)
+        self.c_xy += dx * (y - self.moyenne_y)
+        return self
+
+    def retirer_valeur(self, x, y=0.0):
+        """Retire une observation déjà ajoutée (Welford inversé, O(1))."""
+        if self.n <= 1:
+            self.__init__()
+            return self
+        self.n -= 1
+        dx = x - self.moyenne_x
+        dy = y - self.moyenne_y
+        self.moyenne_x -= dx / self.n
+        self.moyenne_y -= dy / self.n
+        self.m2_x = max(0.0, self.m2_x - dx * (x - self.moyenne_x))
+        self.m2_y = max(0.0, self.m2_y - dy * (y - self.moyenne_y))
+        self.c_xy -= dx * (y - self.moyenne_y)
+        return self
+
+    def fusionner(self, autre):
+        """Combine un autre état `Moments` dans celui-ci."""
+        if autre.n == 0:
+            return self
+        if self.n == 0:
+            for attribut in self.__slots__:
+                setattr(self, attribut, getattr(autre, attribut))
+            return self
+        n = self.n + autre.n
+        delta_x = autre.moyenne_x - self.moyenne_x
+        delta_y = autre.moyenne_y - self.moyenne_y
+        poids = self.n * autre.n / n
+        self.m2_x += autre.m2_x + delta_x * delta_x * poids
+        self.m2_y += autre.m2_y + delta_y * delta_y * poids
+        self.c_xy += autre.c_xy + delta_x * delta_y * poids
+        self.moyenne_x += delta_x * autre.n / n
+        self.moyenne_y += delta_y * autre.n / n
+        self.n = n
+        return self
+
+    def __repr__(self):
+        return (f"Moments(n={self.n}, moyenne_x={self.moyenne_x}, "
+                f"moyenne_y={self.moyenne_y})")
+
+
+class Gram:
+    """Moyennes et matrice des co-moments centrés de k variables."""
+    __slots__ = ("n", "moyennes", "co")
+
+    def __init__(self, k=0):
+        self.n = 0
+        self.moyennes = [0.0] * k
+        self.co = [[0.0] * k for _ in range(k)]
+
+    @property
+    def k(self):
+        return len(self.moyennes)
+
+    @classmethod
+    def depuis_colonnes(cls, colonnes):
+        return cls().ajouter_colonnes(colonnes)
+
+    def ajouter_colonnes(self, colonnes):
+        """Intègre des colonnes de taille quelconque, par blocs de `TAILLE_BLOC`."""
+        n = len(colonnes[0]) if colonnes else 0
+        for debut in range(0, n, TAILLE_BLOC):
+            self.ajouter_bloc([c[debut:debut + TAILLE_BLOC] for c in colonnes])
+        return self
+
+    def ajouter_bloc(self, colonnes):
+        """Intègre un bloc de colonnes de même longueur."""
+        n_b = len(colonnes[0]) if colonnes else 0
+        if n_b == 0:
+            return self
+        autre = Gram()
+        autre.n = n_b
+        autre.moyennes, autre.co = choisir_backend(colonnes[0]).gram(colonnes)
+        return self.fusionner(autre)
+
+    def fusionner(self, autre):
+        """Combine un autre état `Gram` dans celui-ci."""
+        if autre.n == 0:
+            return self
+        if self.n == 0:
+            self.n = autre.n
+            self.moyennes = list(autre.moyennes)
+            self.co = [list(ligne) for ligne in autre.co]
+            return self
+        if autre.k != self.k:
+            raise ValueError("Les états à fusionner n'ont pas le même nombre de colonnes")
+        n = self.n + autre.n
+        delta = [b - a for a, b in zip(self.moyennes, autre.moyennes)]
+        poids = self.n * autre.n / n
+        for i, (ligne, ligne_autre) in enumerate(zip(self.co, autre.co)):
+            facteur = delta[i] * poids
+            for j in range(self.k):
+                ligne[j] += ligne_autre[j] + facteur * delta[j]
+        self.moyennes = [m + d * autre.n / n for m, d in zip(self.moyennes, delta)]
+        self.n = n
+        return self
+
+    def __repr__(self):
+        return f"Gram(n={self.n}, k={self.k})"
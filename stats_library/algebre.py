@@ -0,0 +1,51 @@
+"""
+Algèbre linéaire minimale pour les petits systèmes symétriques.
+
+Les matrices sont des listes de lignes. Les systèmes résolus ici ont la
+taille du nombre de variables (quelques dizaines au plus) : la
+décomposition de Cholesky en Python pur suffit.
+"""
+
+import math
+
+
+def cholesky(a):
+    """
+    Facteur triangulaire inférieur L tel que a = L Lᵀ.
+
+    Lève ValueError si `a` n'est pas définie positive (variables
+    colinéaires ou constantes).
+    """
+    n = len(a)
+    l = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1):
+            s = a[i][j] - math.fsum(l[i][k] * l[j][k] for k in range(j))
+            if i == j:
+                # Tolérance relative à la diagonale : indépendante de l'échelle des variables
+                if a[i][i] == 0 or s <= 1e-12 * abs(a[i][i]):
+                    raise ValueError("Matrice singulière : variables colinéaires ou constantes")
+                l[i][i] = math.sqrt(s)
+            else:
+                l[i][j] = s / l[j][j]
+    return l
+
+
+def resoudre_cholesky(l, b):
+    """Résout L Lᵀ x = b par deux substitutions."""
+    n = len(l)
+    y = [0.0] * n
+    for i in range(n):
+        y[i] = (b[i] - math.fsum(l[i][k] * y[k] for k in range(i))) / l[i][i]
+    x = [0.0] * n
+    for i in reversed(range(n)):
+        x[i] = (y[i] - math.fsum(l[k][i] * x[k] for k in range(i + 1, n))) / l[i][i]
+    return x
+
+
+def inverse_cholesky(l):
+    """Inverse de L Lᵀ, colonne par colonne."""
+    n = len(l)
+    colonnes = [resoudre_cholesky(l, [1.0 if i == j else 0.0 for i in range(n)])
+                for j in range(n)]
+    return [[colonnes[j][i] for j in range(n)] for i in range(n)]
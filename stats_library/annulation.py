@@ -0,0 +1,86 @@
+"""
+Annulation coopérative et échéances des calculs longs.
+
+Un `JetonAnnulation` est partagé entre l'appelant et le calcul.
+L'appelant peut l'annuler depuis un autre fil d'exécution ou un
+gestionnaire de signal, ou lui fixer un budget (en secondes). Le calcul
+est mené par blocs de lignes (voir `Analyseur.executer`) et consulte le
+jeton entre deux blocs : il s'arrête alors proprement, avec un résultat
+partiel (calculé sur les lignes déjà traitées) si la méthode suit le
+protocole incrémental. Le journal reçoit le statut "ANNULE" ou "EXPIRE".
+"""
+
+import threading
+import time
+from stats_library.donnees import Colonnes
+
+ANNULE = "ANNULE"
+EXPIRE = "EXPIRE"
+# Lignes traitées entre deux consultations du jeton
+TAILLE_ETAPE = 65536
+
+
+class JetonAnnulation:
+    """Demande d'arrêt d'un calcul : annulation explicite ou échéance."""
+
+    def __init__(self, budget=None):
+        self._annule = threading.Event()
+        self.echeance = time.perf_counter() + budget if budget is not None else None
+
+    def annuler(self):
+        """Demande l'arrêt du calcul (sûr depuis un autre fil ou un signal)."""
+        self._annule.set()
+
+    @property
+    def statut(self):
+        """"ANNULE", "EXPIRE", ou None si le calcul peut continuer."""
+        if self._annule.is_set():
+            return ANNULE
+        if self.echeance is not None and time.perf_counter() >= self.echeance:
+            return EXPIRE
+        return None
+
+    def __repr__(self):
+        return f"JetonAnnulation(statut={self.statut!r})"
+
+
+def executer_par_etapes(methode, donnees, progression=None, jeton=None, taille=TAILLE_ETAPE):
+    """
+    Calcule `methode` sur `donnees` par blocs de `taille` lignes.
+
+    `progression(lignes_traitees, lignes_totales)` est appelée après
+    chaque bloc. Retourne (résultat, statut, lignes traitées) : le statut
+    vaut None si le calcul est allé à son terme ; sinon le résultat est
+    partiel, ou None si la méthode ne suit pas le protocole incrémental
+    (elle est alors calculée d'un seul tenant et le jeton n'est consulté
+    qu'avant).
+    """
+    if not isinstance(donnees, Colonnes):
+        donnees = Colonnes.depuis_lignes(donnees)
+    total = len(donnees)
+    try:
+        etat = methode.initialiser()
+    except NotImplementedError:
+        statut = jeton.statut if jeton is not None else None
+        if statut is not None:
+            return None, statut, 0
+        resultat = methode.calculer(donnees)
+        if progression is not None:
+            progression(total, total)
+        return resultat, None, total
+
+    lignes = 0
+    while lignes < total:
+        statut = jeton.statut if jeton is not None else None
+        if statut is not None:
+            try:
+                partiel = methode.finaliser(etat) if lignes else None
+            except ValueError:  # pas assez de lignes pour un résultat partiel
+                partiel = None
+            return partiel, statut, lignes
+        fin = min(lignes + taille, total)
+        etat = methode.mettre_a_jour(etat, donnees.tranche(lignes, fin))
+        lignes = fin
+        if progression is not None:
+            progression(lignes, total)
+    return methode.finaliser(etat), None, total
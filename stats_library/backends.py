@@ -0,0 +1,300 @@
+"""
+Moteurs de calcul des noyaux numériques.
+
+Les accumulateurs (`Moments`, `Gram`) et la sélection des quantiles
+délèguent leur boucle interne à un moteur :
+
+- ``python`` : implémentation de référence, boucles explicites ;
+- ``tableau`` : `math.fsum` et `map(operator.mul, ...)` sur des tampons
+  `array('d')`, sans dépendance ;
+- ``numpy`` : opérations vectorisées, si NumPy est installé.
+
+`choisir_backend(valeurs)` retient NumPy pour les tableaux NumPy et les
+blocs d'au moins `SEUIL_NUMPY` valeurs, ``tableau`` sinon. Le choix peut
+être imposé par `definir_backend(nom)` ou par la variable
+d'environnement ``STATS_BACKEND`` (héritée par les processus de
+travail). `verifier_backends()` compare chaque moteur à la référence.
+"""
+
+import math
+import operator
+import os
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel
+    np = None
+
+# En dessous de cette taille, le coût de conversion vers NumPy domine
+SEUIL_NUMPY = 1024
+
+
+class BackendPython:
+    """Référence : boucles Python directes, deux passages."""
+    nom = "python"
+
+    def somme(self, x):
+        total = 0.0
+        for v in x:
+            total += v
+        return total
+
+    def moments(self, x, y=None):
+        """(n, moyenne_x, moyenne_y, m2_x, m2_y, c_xy) d'un bloc."""
+        n = len(x)
+        mx = self.somme(x) / n
+        m2x = sum((v - mx) ** 2 for v in x)
+        if y is None:
+            return n, mx, 0.0, m2x, 0.0, 0.0
+        my = self.somme(y) / n
+        m2y = sum((v - my) ** 2 for v in y)
+        cxy = sum((a - mx) * (b - my) for a, b in zip(x, y))
+        return n, mx, my, m2x, m2y, cxy
+
+    def gram(self, colonnes):
+        """(moyennes, matrice des co-moments centrés) d'un bloc de colonnes."""
+        n = len(colonnes[0])
+        moyennes = [self.somme(c) / n for c in colonnes]
+        co = [[sum((a - mi) * (b - mj) for a, b in zip(ci, cj))
+               for cj, mj in zip(colonnes, moyennes)]
+              for ci, mi in zip(colonnes, moyennes)]
+        return moyennes, co
+
+    def selectionner(self, valeurs, rangs):
+        """{rang: valeur} pour des rangs 0-based, comme si `valeurs` était trié."""
+        triee = sorted(valeurs)
+        return {rang: triee[rang] for rang in rangs}
+
+    def classement(self, x, y):
+        """
+        (rangs_x, rangs_y, ex aequo en x, en y, en (x, y), suite des y dans
+        l'ordre (x, y)) ; la suite sert au compte des échanges (`echanges`).
+        """
+        from stats_library.rangs import classer  # import circulaire
+        return classer(x, y)
+
+    def echanges(self, suite):
+        """Échanges de Knight : paires i < j avec suite[i] > suite[j]."""
+        from stats_library.rangs import compter_echanges  # import circulaire
+        return compter_echanges(suite)
+
+
+class BackendTableau(BackendPython):
+    """Tampons contigus, sommes en C (`map`, `math.fsum`), sélection rapide."""
+    nom = "tableau"
+
+    def somme(self, x):
+        return math.fsum(x)
+
+    def moments(self, x, y=None):
+        n = len(x)
+        mx = sum(x) / n
+        dx = [v - mx for v in x]
+        m2x = sum(map(operator.mul, dx, dx))
+        if y is None:
+            return n, mx, 0.0, m2x, 0.0, 0.0
+        my = sum(y) / n
+        dy = [v - my for v in y]
+        return (n, mx, my, m2x, sum(map(operator.mul, dy, dy)),
+                sum(map(operator.mul, dx, dy)))
+
+    def gram(self, colonnes):
+        n = len(colonnes[0])
+        moyennes = [sum(c) / n for c in colonnes]
+        centrees = [[v - m for v in c] for c, m in zip(colonnes, moyennes)]
+        co = [[0.0] * len(colonnes) for _ in colonnes]
+        # Matrice symétrique : seul le triangle supérieur est calculé
+        for i, ci in enumerate(centrees):
+            for j in range(i, len(centrees)):
+                co[i][j] = co[j][i] = sum(map(operator.mul, ci, centrees[j]))
+        return moyennes, co
+
+    def selectionner(self, valeurs, rangs):
+        from stats_library.quantiles import introselect  # import circulaire
+        return introselect(valeurs, rangs)
+
+
+def _vecteur(valeurs):
+    """
+    Vue NumPy 1-D sur une colonne. Une liste de tuples lève TypeError,
+    comme dans les autres moteurs, au lieu d'être aplatie.
+    """
+    try:
+        vecteur = np.asarray(valeurs, dtype=np.float64)
+    except ValueError:  # lignes de longueurs différentes
+        vecteur = None
+    if vecteur is None or vecteur.ndim != 1:
+        raise TypeError("Une colonne doit contenir des nombres, pas des séquences")
+    return vecteur
+
+
+class BackendNumpy(BackendPython):
+    """Opérations vectorisées NumPy (vues sans copie sur les tampons)."""
+    nom = "numpy"
+
+    def somme(self, x):
+        return float(np.sum(_vecteur(x)))
+
+    def moments(self, x, y=None):
+        x = _vecteur(x)
+        mx = x.mean()
+        dx = x - mx
+        m2x = float(dx @ dx)
+        if y is None:
+            return len(x), float(mx), 0.0, m2x, 0.0, 0.0
+        y = _vecteur(y)
+        my = y.mean()
+        dy = y - my
+        return len(x), float(mx), float(my), m2x, float(dy @ dy), float(dx @ dy)
+
+    def gram(self, colonnes):
+        bloc = np.vstack([_vecteur(c) for c in colonnes])
+        moyennes = bloc.mean(axis=1)
+        bloc -= moyennes[:, None]
+        return moyennes.tolist(), (bloc @ bloc.T).tolist()
+
+    def selectionner(self, valeurs, rangs):
+        partition = np.partition(_vecteur(valeurs), rangs)
+        return {rang: float(partition[rang]) for rang in rangs}
+
+    @staticmethod
+    def _groupes(triees):
+        """(indice de groupe de chaque valeur, effectif de chaque groupe) d'une suite triée."""
+        nouveau = np.empty(len(triees), dtype=bool)
+        nouveau[0] = True
+        np.not_equal(triees[1:], triees[:-1], out=nouveau[1:])
+        debuts = np.flatnonzero(nouveau)
+        return np.cumsum(nouveau) - 1, np.diff(np.append(debuts, len(triees)))
+
+    @staticmethod
+    def _liens(effectifs):
+        return int((effectifs * (effectifs - 1) // 2).sum())
+
+    def _rangs(self, valeurs, ordre):
+        """(rangs moyens, ex aequo, rangs denses) des lignes, dans l'ordre d'origine."""
+        groupes, effectifs = self._groupes(valeurs[ordre])
+        debuts = np.cumsum(effectifs) - effectifs
+        rangs = np.empty(len(valeurs))
+        rangs[ordre] = (debuts + (effectifs + 1) / 2)[groupes]
+        denses = np.empty(len(valeurs), dtype=np.int64)
+        denses[ordre] = groupes
+        return rangs, self._liens(effectifs), denses
+
+    def classement(self, x, y):
+        x = _vecteur(x)
+        y = _vecteur(y)
+        n = len(x)
+        ordre_y = np.argsort(y, kind="stable")
+        # Ordre (x, y) : tri stable des x dans l'ordre des y, qui est réutilisé
+        ordre_x = ordre_y[np.argsort(x[ordre_y], kind="stable")]
+        rangs_x, liens_x, denses_x = self._rangs(x, ordre_x)
+        rangs_y, liens_y, denses_y = self._rangs(y, ordre_y)
+        # Ex aequo en (x, y) : groupes consécutifs dans l'ordre (x, y)
+        liens_xy = self._liens(self._groupes((denses_x * n + denses_y)[ordre_x])[1])
+        # Suite des échanges : rangs denses (0 à n-1) de y dans l'ordre (x, y)
+        return rangs_x, rangs_y, liens_x, liens_y, liens_xy, denses_y[ordre_x]
+
+    def echanges(self, suite):
+        # Tri fusion ascendant de la suite (rangs denses, inférieurs à n),
+        # complétée jusqu'à une puissance de 2 par des valeurs plus grandes
+        # que toutes les autres (sans effet sur le compte). À chaque niveau,
+        # les segments de gauche sont rendus triés globalement par un
+        # décalage par paire de segments, et `searchsorted` compte, pour
+        # chaque valeur de droite, les valeurs de gauche inférieures ou
+        # égales : O(n log n) par niveau, O(n log² n) au total.
+        n = len(suite)
+        taille = 1 << max(n - 1, 1).bit_length()
+        complete = np.full(taille, n, dtype=np.int64)
+        complete[:n] = suite
+        suite = complete
+        echanges = 0
+        largeur = 1
+        while largeur < taille:
+            segments = suite.reshape(-1, 2, largeur)
+            paires = len(segments)
+            decalages = np.arange(paires, dtype=np.int64)[:, None] * (n + 1)
+            inferieures = np.searchsorted((segments[:, 0] + decalages).ravel(),
+                                          (segments[:, 1] + decalages).ravel(), side="right")
+            # Valeurs de gauche des paires précédentes : largeur × indice de paire
+            inferieures = int(inferieures.sum()) - largeur * largeur * (paires * (paires - 1) // 2)
+            echanges += largeur * largeur * paires - inferieures
+            # Fusion : le tri stable (timsort) reconnaît les deux segments triés
+            suite = np.sort(segments.reshape(paires, 2 * largeur), axis=1, kind="stable").ravel()
+            largeur *= 2
+        return echanges
+
+
+BACKENDS = {"python": BackendPython(), "tableau": BackendTableau()}
+if np is not None:
+    BACKENDS["numpy"] = BackendNumpy()
+
+_impose = None
+
+
+def definir_backend(nom=None):
+    """Impose un moteur (`python`, `tableau`, `numpy`) ; None ou `auto` rétablit le choix automatique."""
+    global _impose
+    if nom in (None, "", "auto"):
+        _impose = None
+        return
+    if nom not in BACKENDS:
+        raise ValueError(f"Moteur indisponible : '{nom}' (disponibles : {', '.join(BACKENDS)})")
+    _impose = BACKENDS[nom]
+
+
+def backend_actif():
+    """Nom du moteur imposé, ou `auto`."""
+    return _impose.nom if _impose is not None else "auto"
+
+
+def choisir_backend(valeurs=()):
+    """Moteur à utiliser pour `valeurs`, selon leur taille et leur type."""
+    if _impose is not None:
+        return _impose
+    if np is not None and (isinstance(valeurs, np.ndarray) or len(valeurs) >= SEUIL_NUMPY):
+        return BACKENDS["numpy"]
+    return BACKENDS["tableau"]
+
+
+def _ecart(a, b):
+    """Plus grand écart relatif entre deux résultats (nombres ou listes imbriquées)."""
+    if isinstance(a, (list, tuple)):
+        return max((_ecart(u, v) for u, v in zip(a, b)), default=0.0)
+    if isinstance(a, dict):
+        return max((_ecart(a[cle], b[cle]) for cle in a), default=0.0)
+    return abs(a - b) / max(1.0, abs(b))
+
+
+def verifier_backends(taille=10000, graine=0):
+    """
+    Compare chaque moteur disponible à la référence `python` sur des
+    données aléatoires. Retourne {nom: plus grand écart relatif}.
+    """
+    aleatoire = random.Random(graine)
+    x = [aleatoire.gauss(50, 10) for _ in range(taille)]
+    y = [2 * v + aleatoire.gauss(0, 5) for v in x]
+    z = [aleatoire.uniform(-1e3, 1e3) for _ in range(taille)]
+    rangs = sorted({0, taille // 4, taille // 2, taille - 1})
+    # Valeurs arrondies : les rangs doivent traiter les ex aequo
+    x_lies = [round(v) for v in x]
+    y_lies = [round(v, -1) for v in y]
+    reference = BACKENDS["python"]
+
+    def noyaux(backend):
+        classement = backend.classement(x_lies, y_lies)
+        return [
+            backend.somme(x),
+            backend.moments(x),
+            backend.moments(x, y),
+            backend.gram([x, y, z]),
+            backend.selectionner(x, rangs),
+            [list(map(float, classement[0])), list(map(float, classement[1])), *classement[2:5],
+             backend.echanges(classement[5])],
+        ]
+
+    attendu = noyaux(reference)
+    return {nom: _ecart(noyaux(backend), attendu) for nom, backend in BACKENDS.items()}
+
+
+definir_backend(os.environ.get("STATS_BACKEND"))
@@ -0,0 +1,142 @@
+"""
+Cache binaire colonnaire des fichiers chargés.
+
+Format d'un fichier cache :
+
+- signature ``STATCOL1`` (8 octets) ;
+- longueur de l'en-tête (entier 32 bits, petit-boutiste) ;
+- en-tête JSON : nombre de lignes, noms des colonnes, lignes rejetées,
+  ordre des octets et identité du fichier source (taille, mtime,
+  empreinte BLAKE2b) ;
+- bourrage jusqu'à un multiple de 8 octets ;
+- les colonnes, l'une après l'autre, en flottants 64 bits.
+
+À la lecture, le fichier est projeté en mémoire (`mmap`) et chaque
+colonne est une `memoryview` sur cette projection : aucune copie, et
+l'ouverture ne coûte que la lecture de l'en-tête.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from stats_library.donnees import Colonnes
+
+SIGNATURE = b"STATCOL1"
+VERSION = 2
+EXTENSION = ".colonnes"
+
+
+def chemin_cache(chemin_source, largeur_max=2):
+    """
+    Chemin du fichier cache associé à un fichier source. Un chargement
+    limité à d'autres colonnes que les deux premières a son propre cache.
+    """
+    if largeur_max == 2:
+        return chemin_source + EXTENSION
+    return f"{chemin_source}.{largeur_max or 'toutes'}{EXTENSION}"
+
+
+def empreinte_fichier(chemin, taille_bloc=1 << 20):
+    """Empreinte BLAKE2b du contenu d'un fichier."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(chemin, "rb") as f:
+        for bloc in iter(lambda: f.read(taille_bloc), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+def _identite_source(chemin, empreinte=True):
+    stat = os.stat(chemin)
+    identite = {"taille": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if empreinte:
+        identite["empreinte"] = empreinte_fichier(chemin)
+    return identite
+
+
+def ecrire_cache(donnees, chemin, source=None):
+    """
+    Écrit `donnees` (un objet `Colonnes`) au format binaire.
+
+    Si `source` est donné, l'identité du fichier source est enregistrée
+    pour invalider le cache quand il change. L'écriture passe par un
+    fichier temporaire renommé, pour ne jamais laisser un cache partiel.
+    """
+    entete = {
+        "version": VERSION,
+        "lignes": len(donnees),
+        "noms": donnees.noms,
+        "lignes_rejetees": donnees.lignes_rejetees,
+        "ordre": sys.byteorder,
+        "source": _identite_source(source) if source is not None else None,
+    }
+    entete = json.dumps(entete).encode("utf-8")
+    debut = len(SIGNATURE) + 4 + len(entete)
+    bourrage = -debut % 8
+
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as f:
+        f.write(SIGNATURE)
+        f.write(struct.pack("<I", len(entete)))
+        f.write(entete)
+        f.write(b"\0" * bourrage)
+        for colonne in donnees.colonnes():
+            f.write(memoryview(colonne).cast("B"))
+    os.replace(temporaire, chemin)
+
+
+def lire_entete(chemin):
+    """Retourne l'en-tête d'un fichier cache et la position des données."""
+    with open(chemin, "rb") as f:
+        if f.read(len(SIGNATURE)) != SIGNATURE:
+            raise ValueError(f"'{chemin}' n'est pas un cache de colonnes")
+        longueur, = struct.unpack("<I", f.read(4))
+        entete = json.loads(f.read(longueur).decode("utf-8"))
+    debut = len(SIGNATURE) + 4 + longueur
+    return entete, debut + (-debut % 8)
+
+
+def cache_valide(chemin, source, verifier_empreinte=False):
+    """
+    Indique si le cache correspond encore au fichier source.
+
+    La taille et la date de modification suffisent par défaut ;
+    `verifier_empreinte` relit en plus le fichier source pour comparer
+    son empreinte.
+    """
+    if not os.path.exists(chemin):
+        return False
+    try:
+        entete, _ = lire_entete(chemin)
+    except (ValueError, struct.error):
+        return False
+    identite = entete.get("source")
+    if entete.get("version") != VERSION or entete.get("ordre") != sys.byteorder or not identite:
+        return False
+    actuelle = _identite_source(source, empreinte=verifier_empreinte)
+    if (identite["taille"], identite["mtime_ns"]) != (actuelle["taille"], actuelle["mtime_ns"]):
+        return False
+    return not verifier_empreinte or identite.get("empreinte") == actuelle["empreinte"]
+
+
+def ouvrir_cache(chemin):
+    """
+    Ouvre un fichier cache par projection mémoire, sans copie.
+
+    Les colonnes retournées sont des `memoryview` en lecture seule ;
+    la projection reste ouverte tant qu'elles sont référencées.
+    """
+    entete, debut = lire_entete(chemin)
+    if entete.get("ordre") != sys.byteorder:
+        raise ValueError("Cache écrit avec un autre ordre des octets")
+    n = entete["lignes"]
+    with open(chemin, "rb") as f:
+        projection = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    vue = memoryview(projection)
+    colonnes = [vue[debut + i * n * 8:debut + (i + 1) * n * 8].cast("d")
+                for i in range(len(entete["noms"]))]
+    donnees = Colonnes(colonnes, entete["noms"])
+    donnees.lignes_rejetees = entete.get("lignes_rejetees", 0)
+    return donnees
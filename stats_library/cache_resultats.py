@@ -0,0 +1,84 @@
+"""
+Mémoïsation des résultats de calcul.
+
+La clé d'un résultat combine l'empreinte des données (voir
+`stats_library.donnees.empreinte`), la classe de la méthode et ses
+paramètres (`MethodeStatistique.parametres`). Les méthodes non
+déterministes (rééchantillonnage sans graine, quantiles approchés) ne
+sont pas mises en cache. Les entrées les moins récemment utilisées
+sont évincées au-delà de `taille_max`.
+"""
+
+import threading
+from collections import OrderedDict
+from stats_library.donnees import empreinte
+
+
+class CacheResultats:
+    """
+    Cache LRU de résultats, avec compteurs de succès et d'échecs.
+
+    Les accès sont protégés par un verrou : un même cache peut être
+    partagé entre fils d'exécution.
+    """
+
+    def __init__(self, taille_max=128):
+        if taille_max < 1:
+            raise ValueError("taille_max doit être au moins 1")
+        self.taille_max = taille_max
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+
+    @staticmethod
+    def cle(methode, donnees):
+        """
+        Clé d'un calcul : données, classe de la méthode et paramètres ;
+        None si le résultat ne doit pas être mis en cache.
+        """
+        if not methode.deterministe:
+            return None
+        classe = type(methode)
+        return (empreinte(donnees), classe.__module__, classe.__qualname__, methode.parametres())
+
+    def obtenir(self, cle):
+        """Retourne (trouvé, résultat) et met à jour les compteurs."""
+        if cle is None:
+            return False, None
+        with self._verrou:
+            if cle in self._entrees:
+                self._entrees.move_to_end(cle)
+                self.succes += 1
+                return True, self._entrees[cle]
+            self.echecs += 1
+            return False, None
+
+    def stocker(self, cle, resultat):
+        if cle is None:
+            return
+        with self._verrou:
+            self._entrees[cle] = resultat
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+            self.succes = 0
+            self.echecs = 0
+
+    def statistiques(self):
+        with self._verrou:
+            total = self.succes + self.echecs
+            return {
+                "entrees": len(self._entrees),
+                "taille_max": self.taille_max,
+                "succes": self.succes,
+                "echecs": self.echecs,
+                "taux_succes": self.succes / total if total else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entrees)
@@ -0,0 +1,265 @@
+"""
+Chargement de fichiers CSV vers un jeu de données colonnaire.
+
+Le dialecte (séparateur, séparateur décimal, en-tête) est détecté sur le
+premier bloc du fichier, puis le texte est lu par grands blocs et
+converti d'un seul tenant en colonnes (voir `stats_library.dialecte`).
+Les lignes invalides sont comptées dans `lignes_rejetees`.
+
+Les gros fichiers peuvent être découpés en plages d'octets alignées sur
+des fins de ligne et analysés par un pool de processus.
+"""
+
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from stats_library.donnees import ColonneCategorielle, Colonnes
+from stats_library.dialecte import convertir_bloc, detecter_dialecte
+from stats_library.cache_binaire import cache_valide, chemin_cache, ecrire_cache, ouvrir_cache
+
+TAILLE_BLOC_LIGNES = 65536
+# Taille visée des plages d'octets confiées à chaque tâche parallèle
+TAILLE_PLAGE = 64 * 1024 * 1024
+# Taille des blocs lus par le chargement séquentiel
+TAILLE_LECTURE = 4 * 1024 * 1024
+# Octets examinés pour détecter le dialecte
+TAILLE_DETECTION = 64 * 1024
+
+
+def dialecte_fichier(chemin, encodage="utf-8", colonne_cle=None):
+    """Détecte le dialecte d'un fichier CSV d'après son premier bloc."""
+    with open(chemin, mode="rb") as f:
+        tete = f.read(TAILLE_DETECTION)
+        if len(tete) == TAILLE_DETECTION and b"\n" in tete:
+            tete = tete[:tete.rfind(b"\n")]  # pas de ligne (ni caractère) coupée
+    return detecter_dialecte(tete.decode(encodage), colonne_cle)
+
+
+def _vide(dialecte, largeur_max=2):
+    """Jeu de données vide aux colonnes (et noms) du dialecte."""
+    largeur = dialecte.largeur(largeur_max)
+    return Colonnes.vide(largeur, dialecte.noms[:largeur] if dialecte.noms else None)
+
+
+def _ajouter_texte(donnees, texte, dialecte, largeur_max=2):
+    """Convertit un bloc de lignes complètes et l'ajoute à `donnees`."""
+    colonnes, rejetees = convertir_bloc(texte, dialecte, largeur_max)
+    for colonne, partie in zip(donnees.colonnes(), colonnes):
+        colonne.extend(partie)
+    donnees.lignes_rejetees += rejetees
+    return donnees
+
+
+def _blocs_texte(f, encodage, taille=TAILLE_LECTURE):
+    """Texte d'un fichier binaire ouvert, par blocs alignés sur des fins de ligne."""
+    reste = b""
+    while True:
+        morceau = f.read(taille)
+        if not morceau:
+            break
+        morceau = reste + morceau
+        coupure = morceau.rfind(b"\n") + 1
+        reste = morceau[coupure:]
+        if coupure:
+            yield morceau[:coupure].decode(encodage)
+    if reste:
+        yield reste.decode(encodage)
+
+
+def _charger_avec_cle(chemin, colonne_cle, encodage="utf-8", largeur_max=2):
+    """
+    Charge un fichier dont la colonne `colonne_cle` contient une catégorie.
+
+    Même dialecte et même en-tête que `charger_csv` ; les cellules gardent
+    leur position, et les lignes sans clé, d'une autre largeur ou dont une
+    colonne lue est vide ou non numérique sont comptées dans
+    `lignes_rejetees`.
+    """
+    dialecte = dialecte_fichier(chemin, encodage, colonne_cle)
+    largeur = dialecte.largeur(largeur_max)
+    noms = None
+    if dialecte.noms:
+        noms = [nom for i, nom in enumerate(dialecte.noms) if i != colonne_cle][:largeur]
+    donnees = Colonnes.vide(largeur, noms, cle=ColonneCategorielle())
+    with open(chemin, mode="r", encoding=encodage, newline="") as f:
+        if dialecte.entete:
+            f.readline()
+        for row in csv.reader(f, delimiter=dialecte.separateur):
+            if not any(cell.strip() for cell in row):
+                continue
+            if len(row) <= colonne_cle or not row[colonne_cle].strip():
+                donnees.lignes_rejetees += 1
+                continue
+            cle = row.pop(colonne_cle).strip()
+            if dialecte.decimal != ".":
+                row = [cell.replace(dialecte.decimal, ".") for cell in row]
+            try:
+                valeurs = ([float(cell) for cell in row[:largeur]]
+                           if len(row) == dialecte.champs - 1 else None)
+            except ValueError:
+                valeurs = None
+            if valeurs is None:
+                donnees.lignes_rejetees += 1
+                continue
+            donnees.ajouter(valeurs, cle)
+    return donnees
+
+
+def charger_csv(chemin, encodage="utf-8", cache=False, colonne_cle=None, largeur_max=2):
+    """
+    Charge un fichier CSV dans un objet `Colonnes`.
+
+    Avec `cache=True`, un fichier binaire colonnaire est écrit à côté du
+    CSV (voir `stats_library.cache_binaire`) ; les chargements suivants
+    le projettent en mémoire sans analyser le texte, tant que le CSV n'a
+    pas changé.
+
+    `colonne_cle` désigne (par son index) une colonne de catégories,
+    conservée dans `donnees.cle` pour les analyses par groupe ; les
+    valeurs sont lues dans les colonnes restantes. Le cache binaire ne
+    stocke pas les catégories et n'est pas utilisé dans ce cas.
+
+    Seules les `largeur_max` premières colonnes numériques sont lues ;
+    `largeur_max=None` charge toutes les colonnes (analyses multivariées).
+    Les lignes vides sont ignorées ; les lignes non numériques ou d'une
+    autre largeur que celle du fichier (plus courtes ou plus longues) sont
+    comptées dans `donnees.lignes_rejetees`.
+    """
+    if colonne_cle is not None:
+        donnees = _charger_avec_cle(chemin, colonne_cle, encodage, largeur_max)
+        if not len(donnees):
+            raise ValueError("Aucune donnée valide trouvée dans le fichier.")
+        return donnees
+
+    if cache:
+        fichier_cache = chemin_cache(chemin, largeur_max)
+        if cache_valide(fichier_cache, chemin):
+            return ouvrir_cache(fichier_cache)
+
+    dialecte = dialecte_fichier(chemin, encodage)
+    donnees = _vide(dialecte, largeur_max)
+    with open(chemin, mode="rb") as f:
+        if dialecte.entete:
+            f.readline()
+        for texte in _blocs_texte(f, encodage):
+            _ajouter_texte(donnees, texte, dialecte, largeur_max)
+
+    if not len(donnees):
+        raise ValueError("Aucune donnée valide trouvée dans le fichier.")
+
+    if cache:
+        try:
+            ecrire_cache(donnees, fichier_cache, source=chemin)
+        except OSError:
+            pass  # le cache est facultatif (répertoire en lecture seule, etc.)
+    return donnees
+
+
+def lire_csv_par_blocs(chemin, taille_bloc=TAILLE_BLOC_LIGNES, encodage="utf-8", largeur_max=2):
+    """
+    Lit un fichier CSV par blocs de `taille_bloc` lignes.
+
+    Chaque bloc est un objet `Colonnes` ; la mémoire utilisée ne dépend
+    pas de la taille du fichier. `largeur_max` : voir `charger_csv`.
+    """
+    dialecte = dialecte_fichier(chemin, encodage)
+    with open(chemin, mode="rb") as f:
+        if dialecte.entete:
+            f.readline()
+        while True:
+            lignes = list(itertools.islice(f, taille_bloc))
+            if not lignes:
+                break
+            bloc = _ajouter_texte(_vide(dialecte, largeur_max), b"".join(lignes).decode(encodage),
+                                  dialecte, largeur_max)
+            if len(bloc):
+                yield bloc
+
+
+def _decouper(chemin, processus, encodage):
+    """
+    Retourne le dialecte du fichier et les plages (début, fin) d'octets
+    à analyser, alignées sur des fins de ligne, en-tête exclu.
+    """
+    taille = os.path.getsize(chemin)
+    dialecte = dialecte_fichier(chemin, encodage)
+    with open(chemin, mode="rb") as f:
+        if dialecte.entete:
+            f.readline()
+        debut = f.tell()
+
+        nombre = max(processus, -(-(taille - debut) // TAILLE_PLAGE))
+        bornes = [debut]
+        for i in range(1, nombre):
+            f.seek(debut + (taille - debut) * i // nombre)
+            f.readline()  # avancer jusqu'à la fin de ligne suivante
+            position = f.tell()
+            if bornes[-1] < position < taille:
+                bornes.append(position)
+        bornes.append(taille)
+    return dialecte, list(zip(bornes[:-1], bornes[1:]))
+
+
+def _lire_plage(chemin, debut, fin, dialecte, encodage, largeur_max=2):
+    """Analyse les lignes comprises entre deux positions d'octets."""
+    with open(chemin, mode="rb") as f:
+        f.seek(debut)
+        texte = f.read(fin - debut).decode(encodage)
+    return _ajouter_texte(_vide(dialecte, largeur_max), texte, dialecte, largeur_max)
+
+
+def _etat_plage(chemin, debut, fin, dialecte, encodage, methode, largeur_max=2):
+    """État partiel de `methode` sur une plage d'octets."""
+    donnees = _lire_plage(chemin, debut, fin, dialecte, encodage, largeur_max)
+    return methode.mettre_a_jour(methode.initialiser(), donnees)
+
+
+def _executer(fonction, chemin, processus, encodage, *arguments, largeur_max=2):
+    """Applique `fonction` à chaque plage, dans un pool si nécessaire."""
+    processus = processus or os.cpu_count() or 1
+    dialecte, plages = _decouper(chemin, processus, encodage)
+    arguments += (largeur_max,)
+    if processus == 1 or len(plages) == 1:
+        return [fonction(chemin, debut, fin, dialecte, encodage, *arguments)
+                for debut, fin in plages]
+    with ProcessPoolExecutor(max_workers=processus) as pool:
+        futures = [pool.submit(fonction, chemin, debut, fin, dialecte, encodage, *arguments)
+                   for debut, fin in plages]
+        return [future.result() for future in futures]
+
+
+def charger_csv_parallele(chemin, processus=None, encodage="utf-8", largeur_max=2):
+    """
+    Charge un fichier CSV en parallèle dans un objet `Colonnes`.
+
+    Le fichier est découpé en plages d'octets alignées sur des fins de
+    ligne (les champs entre guillemets contenant des sauts de ligne ne
+    sont pas supportés) ; chaque plage est analysée par un processus du
+    pool et les colonnes obtenues sont concaténées dans l'ordre.
+    `largeur_max` : voir `charger_csv`.
+    """
+    morceaux = _executer(_lire_plage, chemin, processus, encodage, largeur_max=largeur_max)
+    donnees = Colonnes.vide(morceaux[0].largeur, morceaux[0].noms)
+    for morceau in morceaux:
+        for colonne, partie in zip(donnees.colonnes(), morceau.colonnes()):
+            colonne.extend(partie)
+        donnees.lignes_rejetees += morceau.lignes_rejetees
+    if not len(donnees):
+        raise ValueError("Aucune donnée valide trouvée dans le fichier.")
+    return donnees
+
+
+def analyser_csv_parallele(chemin, methode, processus=None, encodage="utf-8", largeur_max=2):
+    """
+    Calcule l'état de `methode` sur un fichier CSV, en parallèle.
+
+    `methode` doit suivre le protocole incrémental (une stratégie ou un
+    `PlanExecution`). Chaque processus ne renvoie qu'un état partiel ;
+    les états sont fusionnés ici. Retourne l'état fusionné.
+    """
+    etats = _executer(_etat_plage, chemin, processus, encodage, methode, largeur_max=largeur_max)
+    etat = etats[0]
+    for autre in etats[1:]:
+        etat = methode.fusionner(etat, autre)
+    return etat
@@ -0,0 +1,170 @@
+"""
+Ligne de commande non interactive.
+
+    python -m stats_library run *.csv --methods moyenne,mediane --jobs 8 --format json
+    python -m stats_library methodes
+    python -m stats_library serve --port 8765
+
+`run` analyse les fichiers en parallèle (un processus par fichier en
+cours) et écrit un résultat par fichier dès qu'il est terminé : une ligne
+JSON (`--format json`) ou une ligne lisible (`--format texte`). Chaque
+calcul est journalisé ; avec `--journal`, le journal est écrit en JSONL
+à la fin de l'exécution. Le code de sortie vaut 1 si un fichier ou une
+méthode a échoué.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from stats_library.backends import definir_backend
+from stats_library.core import JournalCalculs
+from stats_library.puits_journal import PuitsJSONL
+from stats_library.registre import REGISTRE
+from stats_library.strategies import analyser_fichier
+
+
+def _analyser(chemin, noms, cache, incremental=False):
+    """Exécuté dans un processus de travail : un résultat sérialisable par fichier."""
+    debut = time.perf_counter()
+    try:
+        lignes, resultats = analyser_fichier(chemin, noms, cache, incremental)
+    except (OSError, ValueError) as e:
+        lignes, resultats = 0, {nom: (False, str(e)) for nom in noms}
+    return {
+        "fichier": chemin,
+        "lignes": lignes,
+        "duree": time.perf_counter() - debut,
+        "resultats": {nom: r for nom, (ok, r) in resultats.items() if ok},
+        "erreurs": {nom: r for nom, (ok, r) in resultats.items() if not ok},
+    }
+
+
+def _fichiers(motifs):
+    """Développe les motifs (utile sous Windows, où le shell ne le fait pas)."""
+    fichiers = []
+    for motif in motifs:
+        trouves = sorted(glob.glob(motif)) if glob.has_magic(motif) else [motif]
+        fichiers.extend(trouves)
+    return list(dict.fromkeys(fichiers))
+
+
+def _afficher(sortie, format_sortie):
+    if format_sortie == "json":
+        ligne = json.dumps(sortie, ensure_ascii=False, default=str)
+    else:
+        valeurs = [f"{nom}={r}" for nom, r in sortie["resultats"].items()]
+        valeurs += [f"{nom}: ERREUR ({e})" for nom, e in sortie["erreurs"].items()]
+        ligne = f"{sortie['fichier']} ({sortie['lignes']} lignes) : " + ", ".join(valeurs)
+    print(ligne, flush=True)
+
+
+def lister_methodes():
+    print(f"{'Nom':22} {'Libellé':24} {'Paires':7} {'Flux':5} {'Fusion':7} Coût")
+    for entree in REGISTRE.entrees():
+        try:
+            c = entree.capacites
+        except (ImportError, AttributeError, TypeError) as e:
+            print(f"{entree.nom:22} [indisponible : {e}]")
+            continue
+        oui = {True: "oui", False: "non"}
+        print(f"{entree.nom:22} {entree.libelle:24} {oui[c['paires']]:7} {oui[c['flux']]:5} "
+              f"{oui[c['fusionnable']]:7} {c['cout']}")
+    return 0
+
+
+def executer(options):
+    noms = [nom.strip() for nom in options.methods.split(",") if nom.strip()]
+    try:
+        classes = {nom: REGISTRE.obtenir(nom).classe.__name__ for nom in noms}
+        if options.incremental:
+            for nom in noms:
+                if not REGISTRE.obtenir(nom).capacites["fusionnable"]:
+                    raise ValueError(f"{classes[nom]} ne supporte pas le calcul incrémental")
+    except ValueError as e:
+        print(f"[ERREUR] {e}", file=sys.stderr)
+        return 2
+    fichiers = _fichiers(options.fichiers)
+    if not fichiers:
+        print("[ERREUR] Aucun fichier à analyser", file=sys.stderr)
+        return 2
+
+    journal = JournalCalculs()
+    puits = PuitsJSONL(options.journal) if options.journal else None
+    if puits:
+        journal.configurer(puits=puits)
+
+    def enregistrer(sortie):
+        details = {"fichier": sortie["fichier"], "lignes": sortie["lignes"],
+                   "duree_groupe": sortie["duree"]}
+        for nom, resultat in sortie["resultats"].items():
+            journal.enregistrer(classes[nom], resultat, **details)
+        for nom, erreur in sortie["erreurs"].items():
+            journal.enregistrer(classes[nom], erreur,
+                                status="ECHEC", **details)
+        _afficher(sortie, options.format)
+        return not sortie["erreurs"]
+
+    succes = True
+    try:
+        if options.jobs == 1:
+            for chemin in fichiers:
+                succes &= enregistrer(_analyser(chemin, noms, options.cache,
+                                                options.incremental))
+        else:
+            with ProcessPoolExecutor(max_workers=options.jobs) as pool:
+                taches = [pool.submit(_analyser, chemin, noms, options.cache,
+                                      options.incremental)
+                          for chemin in fichiers]
+                for tache in as_completed(taches):
+                    succes &= enregistrer(tache.result())
+    finally:
+        if puits:
+            puits.fermer()  # écrit les dernières entrées du journal
+    return 0 if succes else 1
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m stats_library",
+                                     description="Analyse statistique en ligne de commande")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    run = commandes.add_parser("run", help="analyser des fichiers CSV en lot")
+    run.add_argument("fichiers", nargs="+", help="fichiers CSV ou motifs (*.csv)")
+    run.add_argument("--methods", default="moyenne,mediane",
+                     help="méthodes séparées par des virgules (voir la commande `methodes`)")
+    run.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                     help="nombre de processus (défaut : nombre de processeurs)")
+    run.add_argument("--format", choices=("json", "texte"), default="json")
+    run.add_argument("--journal", help="fichier JSONL où écrire le journal des calculs")
+    run.add_argument("--cache", action="store_true",
+                     help="lire et écrire le cache binaire <fichier>.colonnes à côté des CSV")
+    run.add_argument("--incremental", action="store_true",
+                     help="ne lire que les lignes ajoutées depuis l'exécution précédente")
+    run.add_argument("--backend", help="moteur de calcul imposé (python, tableau, numpy)")
+
+    commandes.add_parser("methodes", help="lister les méthodes et leurs capacités")
+
+    commandes.add_parser("serve", help="lancer le service d'analyse (voir --help)",
+                         add_help=False)
+
+    options, reste = parser.parse_known_args(arguments)
+    if options.commande == "serve":
+        from stats_library.service import main as servir
+        return servir(reste)
+    if reste:
+        parser.error(f"arguments non reconnus : {' '.join(reste)}")
+    if options.commande == "methodes":
+        return lister_methodes()
+    if options.jobs < 1:
+        parser.error("--jobs doit être au moins 1")
+    if options.backend:
+        try:
+            definir_backend(options.backend)
+        except ValueError as e:
+            parser.error(str(e))
+        os.environ["STATS_BACKEND"] = options.backend  # hérité par les processus
+    return executer(options)
@@ -1,31 +1,243 @@
 import datetime
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+
+FORMAT_DATE = "%Y-%m-%d %H:%M:%S"
+
+
+def formater_entree(entree):
+    """
+    Convertit une entrée brute (horodatage, méthode, résultat, statut,
+    détails) en dict ; les détails (durées, taille des données...) sont
+    ajoutés comme clés supplémentaires.
+    """
+    horodatage, methode, resultat, status, details = entree
+    log_entry = {
+        "date": datetime.datetime.fromtimestamp(horodatage).strftime(FORMAT_DATE),
+        "methode": methode,
+        "resultat": resultat,
+        "status": status
+    }
+    if details:
+        log_entry.update(details)
+    return log_entry
+
+
+def _percentile(valeurs_triees, p):
+    """Percentile par interpolation linéaire sur des valeurs triées."""
+    h = (len(valeurs_triees) - 1) * p
+    bas = int(h)
+    haut = min(bas + 1, len(valeurs_triees) - 1)
+    return valeurs_triees[bas] + (valeurs_triees[haut] - valeurs_triees[bas]) * (h - bas)
+
+
+def _copier(tampon):
+    """Copie un tampon qu'un autre fil peut modifier pendant la lecture."""
+    while True:
+        try:
+            return list(tampon)
+        except RuntimeError:  # "deque mutated during iteration" : réessayer
+            continue
+
 
 class JournalCalculs:
-    """Singleton pour journaliser tous les calculs."""
+    """
+    Singleton pour journaliser tous les calculs.
+
+    Les entrées sont conservées sous forme brute dans des tampons
+    circulaires bornés (`taille_max`, les plus anciennes sont écartées) ;
+    la date n'est formatée qu'à la lecture, dans `consulter()`. Un
+    puits optionnel (voir `stats_library.puits_journal`) persiste les
+    entrées sur disque depuis un fil d'exécution séparé.
+
+    Le journal est sûr entre fils d'exécution : chaque fil écrit dans
+    son propre tampon, sans verrou ni contention, et les tampons sont
+    fusionnés par ordre chronologique à la lecture. Les tampons des
+    fils terminés sont regroupés dans une archive commune.
+    """
     _instance = None
+    _verrou_creation = threading.Lock()
+    TAILLE_MAX = 10000
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(JournalCalculs, cls).__new__(cls)
-            cls._instance.logs = []
+            with cls._verrou_creation:
+                # Revérifier : un autre fil a pu créer l'instance entre-temps
+                if cls._instance is None:
+                    instance = super(JournalCalculs, cls).__new__(cls)
+                    instance._initialiser()
+                    cls._instance = instance
         return cls._instance
 
-    def enregistrer(self, methode, resultat, status="SUCCES"):
-            log_entry = {
-                  "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                  "methode": methode,
-                  "resultat": resultat,
-                  "status": status
-                }
-            self.logs.append(log_entry)
+    def _initialiser(self):
+        self._verrou = threading.Lock()
+        self._taille_max = self.TAILLE_MAX
+        self._local = threading.local()
+        self._tampons = []  # (fil, tampon) pour chaque fil ayant écrit
+        self._archive = deque(maxlen=self._taille_max)
+        self._puits = None
+
+    def _tampon(self):
+        """Tampon du fil courant, créé à sa première écriture."""
+        tampon = deque(maxlen=self._taille_max)
+        with self._verrou:
+            vivants = []
+            for fil, autre in self._tampons:
+                if fil.is_alive():
+                    vivants.append((fil, autre))
+                else:
+                    self._archive.extend(autre)
+            vivants.append((threading.current_thread(), tampon))
+            self._tampons = vivants
+        self._local.tampon = tampon
+        return tampon
+
+    def configurer(self, taille_max=None, puits=None, recharger=False):
+        """
+        Change la taille des tampons et/ou attache un puits persistant.
 
+        Avec `recharger=True`, les dernières entrées enregistrées par le
+        puits (lors d'exécutions précédentes) sont rechargées ; celles
+        déjà présentes en mémoire ne sont pas dupliquées.
+        """
+        with self._verrou:
+            if taille_max is not None:
+                entrees = self._fusionner()
+                self._taille_max = taille_max
+                self._archive = deque(entrees, maxlen=taille_max)
+                self._tampons = []
+                self._local = threading.local()
+            if puits is not None:
+                if self._puits is not None and self._puits is not puits:
+                    self._puits.fermer()
+                self._puits = puits
+                if recharger:
+                    entrees = self._fusionner()
+                    # Une entrée est identifiée par son horodatage, sa méthode et son statut
+                    presentes = {(e[0], e[1], e[3]) for e in entrees}
+                    anciennes = [e for e in puits.charger(self._taille_max)
+                                 if (e[0], e[1], e[3]) not in presentes]
+                    entrees = sorted(anciennes + entrees, key=lambda entree: entree[0])
+                    self._archive = deque(entrees, maxlen=self._taille_max)
+                    self._tampons = []
+                    self._local = threading.local()
+
+    def enregistrer(self, methode, resultat, status="SUCCES", **details):
+        entree = (time.time(), methode, resultat, status, details)
+        tampon = getattr(self._local, "tampon", None)
+        if tampon is None:
+            tampon = self._tampon()
+        tampon.append(entree)
+        puits = self._puits
+        if puits is not None:
+            puits.soumettre(entree)
+
+    def _fusionner(self):
+        """Entrées brutes de tous les tampons, par ordre chronologique."""
+        entrees = list(self._archive)
+        for _, tampon in self._tampons:
+            entrees.extend(_copier(tampon))
+        entrees.sort(key=lambda entree: entree[0])
+        return entrees[-self._taille_max:]
 
     def consulter(self):
-        return self.logs
+        with self._verrou:
+            entrees = self._fusionner()
+        return [formater_entree(entree) for entree in entrees]
+
+    def derniere_entree(self):
+        """Dernière entrée enregistrée par le fil courant (formatée), ou None."""
+        tampon = getattr(self._local, "tampon", None)
+        return formater_entree(tampon[-1]) if tampon else None
+
+    def statistiques(self):
+        """
+        Agrégats par méthode sur les calculs réussis et mesurés :
+        nombre d'appels, latences p50/p95 (secondes), lignes traitées
+        et débit moyen (lignes/s).
+        """
+        with self._verrou:
+            entrees = self._fusionner()
+        par_methode = {}
+        for _, methode, _, status, details in entrees:
+            if status == "SUCCES" and details and "duree" in details:
+                par_methode.setdefault(methode, []).append(details)
+        statistiques = {}
+        for methode, mesures in par_methode.items():
+            durees = sorted(m["duree"] for m in mesures)
+            lignes = sum(m.get("lignes", 0) for m in mesures)
+            duree_totale = sum(durees)
+            statistiques[methode] = {
+                "appels": len(mesures),
+                "p50": _percentile(durees, 0.5),
+                "p95": _percentile(durees, 0.95),
+                "lignes": lignes,
+                "lignes_par_seconde": lignes / duree_totale if duree_totale else None,
+            }
+        return statistiques
+
+    @property
+    def logs(self):
+        return self.consulter()
+
+    def vider(self):
+        with self._verrou:
+            self._archive.clear()
+            for _, tampon in self._tampons:
+                tampon.clear()
 
 class MethodeStatistique(ABC):
     """Interface pour les stratégies statistiques."""
+    # Nombre de colonnes lues par la méthode (1 : valeurs, 2 : paires x, y)
+    dimension = 1
+    # Capacités déclarées, utilisées pour planifier l'exécution (voir
+    # stats_library.registre) :
+    # - flux : calcul par blocs en mémoire bornée ;
+    # - fusionnable : états partiels combinables (blocs, processus) ;
+    # - cout : complexité en temps, à titre indicatif ;
+    # - toutes_colonnes : lit toutes les colonnes du fichier ;
+    # - deterministe : mêmes données, même résultat (condition de mise en
+    #   cache, voir stats_library.cache_resultats).
+    flux = False
+    fusionnable = False
+    cout = "O(n)"
+    toutes_colonnes = False
+    deterministe = True
+
     @abstractmethod
     def calculer(self, donnees):
         pass
+
+    def parametres(self):
+        """
+        Paramètres dont dépend le résultat, en un tuple hachable et stable
+        d'une exécution à l'autre (clé de cache). À redéfinir par les
+        méthodes paramétrées.
+        """
+        return ()
+
+    # Protocole incrémental (optionnel). L'état est porté par un objet
+    # séparé, passé explicitement : la stratégie reste sans état et les
+    # états partiels peuvent être calculés puis fusionnés dans des
+    # processus différents.
+    def initialiser(self):
+        """Retourne un état vide."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} ne supporte pas le calcul incrémental")
+
+    def mettre_a_jour(self, etat, bloc):
+        """Intègre un bloc de données à l'état et le retourne."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} ne supporte pas le calcul incrémental")
+
+    def fusionner(self, etat, autre_etat):
+        """Combine deux états partiels et retourne le résultat."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} ne supporte pas le calcul incrémental")
+
+    def finaliser(self, etat):
+        """Calcule le résultat à partir d'un état."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} ne supporte pas le calcul incrémental")
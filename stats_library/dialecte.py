@@ -0,0 +1,180 @@
+"""
+Détection du dialecte CSV et conversion rapide de blocs en colonnes.
+
+`detecter_dialecte` examine le premier bloc d'un fichier : séparateur de
+champs (virgule, point-virgule, tabulation ou barre verticale),
+séparateur décimal (point ou virgule) et présence d'une ligne d'en-tête.
+Le dialecte retenu est celui sous lequel le plus de lignes commencent
+par des champs numériques, avec le même nombre de champs ; à égalité,
+celui qui donne le plus de champs numériques. La virgule décimale n'est
+envisagée que si la virgule ne peut pas être le séparateur de champs
+(moins de la moitié des lignes ont alors au moins deux champs
+numériques) : sinon des lignes de largeurs irrégulières, séparées par
+des virgules, passeraient pour une colonne de nombres décimaux.
+
+`convertir_bloc` convertit un bloc de texte d'un seul tenant : quand
+toutes ses lignes ont le nombre de champs attendu, le bloc (guillemets
+retirés) est découpé en champs par un seul `split`, et chaque colonne
+est convertie par un `map(float, ...)` sur la tranche `champs[j::largeur]`
+vers un tampon `array('d')`. Sinon, le bloc est relu ligne par ligne avec
+`csv.reader` ; les cellules gardent leur position, et les lignes d'une
+autre largeur ou dont une colonne lue est vide ou non numérique sont
+comptées, sans exception par ligne.
+"""
+
+import csv
+import itertools
+from array import array
+from collections import Counter
+
+SEPARATEURS = (",", ";", "\t", "|")
+DECIMAUX = (".", ",")
+# Lignes examinées pour la détection
+LIGNES_DETECTION = 200
+
+
+class Dialecte:
+    """Format d'un fichier CSV numérique."""
+    __slots__ = ("separateur", "decimal", "entete", "champs", "numeriques", "noms")
+
+    def __init__(self, separateur=",", decimal=".", entete=False, champs=1,
+                 numeriques=None, noms=None):
+        self.separateur = separateur
+        self.decimal = decimal
+        self.entete = entete    # la première ligne est un en-tête
+        self.champs = champs    # nombre de champs par ligne
+        # nombre de champs numériques en tête de ligne (les suivants sont ignorés)
+        self.numeriques = champs if numeriques is None else numeriques
+        self.noms = noms        # noms lus dans l'en-tête, ou None
+
+    def largeur(self, largeur_max=2):
+        """Nombre de colonnes lues (au plus `largeur_max`, toutes les numériques si None)."""
+        return self.numeriques if largeur_max is None else min(self.numeriques, largeur_max)
+
+    def __repr__(self):
+        return (f"Dialecte(separateur={self.separateur!r}, decimal={self.decimal!r}, "
+                f"entete={self.entete}, champs={self.champs}, numeriques={self.numeriques})")
+
+
+def _champs(ligne, separateur):
+    """Champs d'une ligne, guillemets compris (voir `csv.reader`)."""
+    return next(csv.reader([ligne], delimiter=separateur), [])
+
+
+def _analyser_ligne(ligne, separateur, decimal, colonne_cle=None):
+    """
+    (nombre de champs, nombre de champs numériques en tête de ligne) ; la
+    colonne `colonne_cle` (catégories) n'est pas comptée parmi ces derniers.
+    """
+    if decimal != ".":
+        ligne = ligne.replace(decimal, ".")
+    champs = _champs(ligne, separateur)
+    nombre = len(champs)
+    if colonne_cle is not None:
+        if nombre <= colonne_cle or not champs[colonne_cle].strip():
+            return nombre, 0
+        del champs[colonne_cle]
+    numeriques = 0
+    for champ in champs:
+        try:
+            float(champ)
+        except ValueError:
+            break
+        numeriques += 1
+    return nombre, numeriques
+
+
+def detecter_dialecte(texte, colonne_cle=None):
+    """
+    Détecte le dialecte d'un fichier à partir de son premier bloc.
+
+    Avec `colonne_cle`, cette colonne contient des catégories : les
+    champs numériques sont comptés parmi les autres colonnes. Lève
+    ValueError si aucune ligne n'est numérique sous aucun dialecte.
+
+    >>> detecter_dialecte("x,y\\n1,2\\n3\\n4,5,6\\n7,8")
+    Dialecte(separateur=',', decimal='.', entete=True, champs=2, numeriques=2)
+    >>> detecter_dialecte("x;y\\n1,5;2\\n3,25;4")
+    Dialecte(separateur=';', decimal=',', entete=True, champs=2, numeriques=2)
+    """
+    lignes = texte.splitlines()[:LIGNES_DETECTION]
+    non_vides = [ligne for ligne in lignes if ligne.strip()]
+    # La virgule est-elle plausible comme séparateur de champs ?
+    virgule = sum(1 for ligne in non_vides if _analyser_ligne(ligne, ",", ".", colonne_cle)[1] >= 2)
+    decimaux = DECIMAUX if 2 * virgule < len(non_vides) else (".",)
+    meilleur, score = None, (0, 0)
+    for separateur in SEPARATEURS:
+        for decimal in decimaux:
+            if decimal == separateur:
+                continue
+            analyses = [_analyser_ligne(ligne, separateur, decimal, colonne_cle)
+                        for ligne in non_vides]
+            comptes = Counter(champs for champs, n in analyses if n)
+            if not comptes:
+                continue
+            champs, nombre = comptes.most_common(1)[0]
+            numeriques = Counter(n for c, n in analyses if n and c == champs)
+            # À égalité, l'ordre de SEPARATEURS et DECIMAUX départage
+            if (nombre, sum(numeriques.elements())) > score:
+                meilleur = Dialecte(separateur, decimal, champs=champs,
+                                    numeriques=numeriques.most_common(1)[0][0])
+                score = (nombre, sum(numeriques.elements()))
+    if meilleur is None:
+        raise ValueError("Aucune donnée valide trouvée dans le fichier.")
+    premiere = lignes[0] if lignes else ""
+    if premiere.strip() and not _analyser_ligne(premiere, meilleur.separateur, meilleur.decimal,
+                                                colonne_cle)[1]:
+        meilleur.entete = True
+        noms = [nom.strip() for nom in _champs(premiere, meilleur.separateur)]
+        if len(noms) == meilleur.champs:
+            meilleur.noms = noms
+    return meilleur
+
+
+def convertir_bloc(texte, dialecte, largeur_max=2):
+    """
+    Convertit un bloc de lignes complètes (en-tête exclu) en colonnes.
+
+    Retourne (colonnes `array('d')`, nombre de lignes rejetées) ; les
+    lignes vides ne sont pas comptées comme rejetées.
+    """
+    separateur, champs = dialecte.separateur, dialecte.champs
+    largeur = dialecte.largeur(largeur_max)
+    if dialecte.decimal != ".":
+        texte = texte.replace(dialecte.decimal, ".")
+    lignes = texte.splitlines()
+    if not lignes:
+        return [array('d') for _ in range(largeur)], 0
+
+    # Chemin rapide : même nombre de champs partout, conversion d'un bloc.
+    # Les guillemets sont retirés ; un champ entre guillemets contenant le
+    # séparateur change le nombre de champs et renvoie au chemin lent.
+    rapides = [ligne.replace('"', '') for ligne in lignes] if '"' in texte else lignes
+    if set(map(str.count, rapides, itertools.repeat(separateur))) == {champs - 1}:
+        jetons = separateur.join(rapides).split(separateur)
+        try:
+            if largeur == champs:
+                # Tous les champs sont lus : une seule conversion, puis des tranches
+                valeurs = array('d', map(float, jetons))
+                return [valeurs] if champs == 1 else [valeurs[j::champs] for j in range(champs)], 0
+            return [array('d', map(float, jetons[j::champs])) for j in range(largeur)], 0
+        except ValueError:
+            pass  # champ vide ou non numérique : relire ligne par ligne
+
+    colonnes = [array('d') for _ in range(largeur)]
+    rejetees = 0
+    for row in csv.reader(lignes, delimiter=separateur):
+        if not any(cell.strip() for cell in row):
+            continue
+        # Les cellules gardent leur position : une colonne vide rejette la
+        # ligne, comme une ligne d'une autre largeur
+        try:
+            valeurs = [float(cell) for cell in row[:largeur]] if len(row) == champs else None
+        except ValueError:
+            valeurs = None
+        if valeurs is None:
+            rejetees += 1
+            continue
+        for colonne, valeur in zip(colonnes, valeurs):
+            colonne.append(valeur)
+    return colonnes, rejetees
@@ -0,0 +1,276 @@
+"""
+Jeu de données colonnaire.
+
+Chaque colonne est stockée dans un tampon contigu de flottants 64 bits
+(``array('d')``) : 8 octets par valeur, sans tuple ni objet ``float``
+intermédiaire. Les stratégies lisent directement ces tampons.
+"""
+
+import hashlib
+import itertools
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel
+    np = None
+
+
+# Identifiants uniques des jeux de données (jamais réutilisés, contrairement à id())
+_jetons = itertools.count()
+
+
+def _en_tampon(colonne):
+    """Retourne la colonne telle quelle si c'est déjà un tampon de doubles."""
+    if isinstance(colonne, array) and colonne.typecode == 'd':
+        return colonne
+    if isinstance(colonne, memoryview) and colonne.format == 'd':
+        return colonne
+    if np is not None and isinstance(colonne, np.ndarray) \
+            and colonne.dtype == np.float64 and colonne.ndim == 1:
+        return colonne
+    return array('d', colonne)
+
+
+class ColonneCategorielle:
+    """
+    Colonne de catégories, codée par dictionnaire : chaque ligne stocke
+    l'index entier (`codes`) de sa modalité dans `modalites`.
+    """
+
+    def __init__(self, valeurs=()):
+        self.codes = array('l')
+        self.modalites = []
+        self._index = {}
+        for valeur in valeurs:
+            self.ajouter(valeur)
+
+    def ajouter(self, valeur):
+        code = self._index.get(valeur)
+        if code is None:
+            code = self._index[valeur] = len(self.modalites)
+            self.modalites.append(valeur)
+        self.codes.append(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.modalites[self.codes[index]]
+
+    def __iter__(self):
+        return map(self.modalites.__getitem__, self.codes)
+
+
+class Colonnes:
+    """
+    Données tabulaires stockées colonne par colonne.
+
+    Une colonne de catégories optionnelle (`cle`) associe une clé de
+    groupe à chaque ligne (voir `regrouper`).
+    """
+
+    def __init__(self, colonnes, noms=None, cle=None):
+        self._colonnes = [_en_tampon(c) for c in colonnes]
+        if not self._colonnes:
+            raise ValueError("Au moins une colonne est requise")
+        n = len(self._colonnes[0])
+        if any(len(c) != n for c in self._colonnes):
+            raise ValueError("Toutes les colonnes doivent avoir la même longueur")
+        if noms is None:
+            noms = [f"colonne{i + 1}" for i in range(len(self._colonnes))]
+        if len(noms) != len(self._colonnes):
+            raise ValueError("Le nombre de noms ne correspond pas au nombre de colonnes")
+        self.noms = list(noms)
+        if cle is not None and not isinstance(cle, ColonneCategorielle):
+            cle = ColonneCategorielle(cle)
+        if cle is not None and len(cle) != n:
+            raise ValueError("La colonne de clés doit avoir la même longueur que les données")
+        self.cle = cle
+        # Lignes du fichier source ignorées au chargement (non numériques, etc.)
+        self.lignes_rejetees = 0
+        self.jeton = next(_jetons)
+        # Jeu propriétaire des tampons (différent de self pour une vue)
+        self._racine = self
+        self._version = 0
+
+    @classmethod
+    def vide(cls, largeur, noms=None, cle=None):
+        """Crée un jeu de données vide de `largeur` colonnes."""
+        return cls([array('d') for _ in range(largeur)], noms, cle)
+
+    @classmethod
+    def depuis_lignes(cls, lignes):
+        """Construit un jeu de données depuis une liste de nombres ou de tuples."""
+        lignes = list(lignes)
+        if lignes and isinstance(lignes[0], (tuple, list)):
+            largeur = len(lignes[0])
+            return cls([array('d', (l[i] for l in lignes)) for i in range(largeur)])
+        return cls([array('d', lignes)])
+
+    @property
+    def largeur(self):
+        return len(self._colonnes)
+
+    @property
+    def version(self):
+        """Compteur de modifications, partagé avec les vues sur les mêmes tampons."""
+        return self._racine._version
+
+    @property
+    def nbytes(self):
+        """Taille mémoire occupée par les valeurs (hors en-têtes d'objets)."""
+        return sum(len(c) * 8 for c in self._colonnes)
+
+    def colonne(self, index):
+        """Retourne la colonne `index` sans copie."""
+        return self._colonnes[index]
+
+    def colonnes(self):
+        return tuple(self._colonnes)
+
+    def selectionner(self, *indices):
+        """Vue sur un sous-ensemble de colonnes (tampons partagés)."""
+        vue = Colonnes([self._colonnes[i] for i in indices],
+                       [self.noms[i] for i in indices], self.cle)
+        vue._racine = self._racine
+        return vue
+
+    def tranche(self, debut, fin):
+        """
+        Lignes `debut` à `fin` (exclue), sans la colonne de clés. Les
+        tampons `memoryview` et NumPy sont partagés, les `array` copiés.
+        """
+        return Colonnes([c[debut:fin] for c in self._colonnes], self.noms)
+
+    def ajouter(self, ligne, cle=None):
+        """Ajoute une ligne (nombre ou séquence de nombres) en fin de jeu."""
+        if self.largeur == 1 and not isinstance(ligne, (tuple, list)):
+            ligne = (ligne,)
+        if len(ligne) != self.largeur:
+            raise ValueError(f"La ligne doit contenir {self.largeur} valeurs")
+        if (cle is None) != (self.cle is None):
+            raise ValueError("Une clé est requise si et seulement si le jeu a une colonne de clés")
+        for colonne, valeur in zip(self._colonnes, ligne):
+            colonne.append(valeur)
+        if cle is not None:
+            self.cle.ajouter(cle)
+        self._racine._version += 1
+
+    def modifiee(self):
+        """Signale une modification faite directement sur les colonnes."""
+        self._racine._version += 1
+
+    def en_numpy(self):
+        """Vues NumPy (sans copie) sur chaque colonne."""
+        if np is None:
+            raise ImportError("NumPy n'est pas installé")
+        return tuple(np.frombuffer(c, dtype=np.float64) if not isinstance(c, np.ndarray) else c
+                     for c in self._colonnes)
+
+    def _ligne(self, i):
+        if self.largeur == 1:
+            return self._colonnes[0][i]
+        return tuple(c[i] for c in self._colonnes)
+
+    def __len__(self):
+        return len(self._colonnes[0])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._ligne(i) for i in range(*index.indices(len(self)))]
+        return self._ligne(index)
+
+    def __iter__(self):
+        if self.largeur == 1:
+            return iter(self._colonnes[0])
+        return zip(*self._colonnes)
+
+    def __repr__(self):
+        return f"Colonnes({len(self)} lignes × {self.largeur} colonnes, noms={self.noms})"
+
+
+def extraire_colonnes(donnees, nombre=None):
+    """
+    Retourne les `nombre` premières colonnes des données (toutes si
+    `nombre` vaut None).
+
+    Un jeu `Colonnes` est lu sans copie. Une liste de nombres est
+    considérée comme une colonne unique ; une liste de tuples (x, y)
+    est décomposée (ancien format).
+    """
+    if isinstance(donnees, Colonnes):
+        if nombre is not None and donnees.largeur < nombre:
+            raise ValueError("Les données doivent être des tuples (x, y)")
+        return donnees.colonnes()[:nombre]
+    if nombre is None:
+        premiere = next(iter(donnees), None)
+        nombre = len(premiere) if isinstance(premiere, (tuple, list)) else 1
+    if nombre == 1:
+        return (donnees,)
+    try:
+        return tuple([d[i] for d in donnees] for i in range(nombre))
+    except (TypeError, IndexError):
+        raise ValueError("Les données doivent être des tuples (x, y)")
+
+
+def empreinte(donnees):
+    """
+    Empreinte peu coûteuse identifiant un contenu de données.
+
+    Pour un jeu `Colonnes`, c'est son identifiant et sa version (O(1)) ;
+    pour une liste, un hachage BLAKE2b de son contenu (toutes colonnes).
+    """
+    if isinstance(donnees, Colonnes):
+        return ("colonnes", donnees.jeton, donnees.version)
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        h.update(array('d', donnees).tobytes())
+        largeur = 1
+    except TypeError:
+        colonnes = extraire_colonnes(donnees)
+        for colonne in colonnes:
+            h.update(array('d', colonne).tobytes())
+        largeur = len(colonnes)
+    return ("contenu", len(donnees), largeur, h.hexdigest())
+
+
+def taille_donnees(donnees):
+    """Nombre de lignes et nombre d'octets de valeurs lus par un calcul."""
+    if isinstance(donnees, Colonnes):
+        return len(donnees), donnees.nbytes
+    n = len(donnees)
+    largeur = len(donnees[0]) if n and isinstance(donnees[0], (tuple, list)) else 1
+    return n, n * largeur * 8
+
+
+def regrouper(donnees, cles=None):
+    """
+    Partitionne les données par clé, en un seul passage.
+
+    Les clés viennent de `cles` (une séquence alignée sur les lignes)
+    ou, à défaut, de la colonne `donnees.cle`. Retourne un dict
+    {clé: Colonnes}, dans l'ordre de première apparition des clés.
+    """
+    if cles is None:
+        if not isinstance(donnees, Colonnes) or donnees.cle is None:
+            raise ValueError("Aucune colonne de clés : passer `cles` ou charger avec `colonne_cle`")
+        cles = donnees.cle
+    elif not isinstance(cles, ColonneCategorielle):
+        cles = ColonneCategorielle(cles)
+    if not isinstance(donnees, Colonnes):
+        donnees = Colonnes.depuis_lignes(donnees)
+    if len(cles) != len(donnees):
+        raise ValueError("Les clés doivent avoir la même longueur que les données")
+
+    # Un passage sur les codes pour les indices de chaque groupe, puis
+    # une extraction par colonne (boucle en C via map)
+    indices = [[] for _ in cles.modalites]
+    for i, code in enumerate(cles.codes):
+        indices[code].append(i)
+    groupes = {}
+    for modalite, lignes in zip(cles.modalites, indices):
+        groupes[modalite] = Colonnes(
+            [array('d', map(colonne.__getitem__, lignes)) for colonne in donnees.colonnes()],
+            donnees.noms)
+    return groupes
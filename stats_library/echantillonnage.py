@@ -0,0 +1,205 @@
+"""
+Échantillonnage des gros fichiers CSV, pour une analyse approchée.
+
+Trois modes :
+
+- ``reservoir`` : un passage sur le fichier, échantillon uniforme de
+  taille fixe (algorithme L : les lignes écartées ne sont ni décodées
+  ni converties) ;
+- ``bernoulli`` : un passage, chaque ligne est retenue avec la
+  probabilité `taux` (sauts de longueur géométrique) ;
+- ``positions`` : des positions d'octets sont tirées au hasard et seule
+  la ligne qui suit chaque position est lue. Le coût ne dépend pas de
+  la taille du fichier ; une ligne est d'autant plus probable que la
+  ligne précédente est longue, ce qui est sans effet quand les lignes
+  ont des longueurs comparables.
+
+`erreur_type` estime l'erreur type d'un résultat par bootstrap sur
+l'échantillon, avec la correction de population finie.
+"""
+
+import math
+import random
+import time
+from stats_library.chargement import _ajouter_texte, _vide, charger_csv, dialecte_fichier
+
+MODES = ("reservoir", "bernoulli", "positions")
+TAILLE_ECHANTILLON = 10000
+REPETITIONS_ERREUR = 100
+# Octets lus en tête de fichier pour estimer la longueur moyenne des lignes
+OCTETS_ESTIMATION = 64 * 1024
+
+
+def _uniforme(rng):
+    """Nombre aléatoire dans ]0, 1[."""
+    u = rng.random()
+    while u == 0.0:
+        u = rng.random()
+    return u
+
+
+def _longueur_moyenne(f, debut):
+    """Longueur moyenne (octets) des lignes en tête de fichier."""
+    f.seek(debut)
+    tete = f.read(OCTETS_ESTIMATION)
+    f.seek(debut)
+    return len(tete) / max(tete.count(b"\n"), 1)
+
+
+def _reservoir(f, taille, rng, echeance):
+    """(lignes retenues, lignes parcourues, interrompu) : algorithme L."""
+    retenues = []
+    w = math.exp(math.log(_uniforme(rng)) / taille)
+    prochaine = taille + int(math.log(_uniforme(rng)) / math.log(1 - w))
+    i = -1
+    for i, ligne in enumerate(f):
+        if i < taille:
+            retenues.append(ligne)
+        elif i == prochaine:
+            retenues[rng.randrange(taille)] = ligne
+            w *= math.exp(math.log(_uniforme(rng)) / taille)
+            prochaine += int(math.log(_uniforme(rng)) / math.log(1 - w)) + 1
+        if echeance is not None and not i & 0xFFF and time.perf_counter() > echeance:
+            return retenues, i + 1, True
+    return retenues, i + 1, False
+
+
+def _bernoulli(f, taux, rng, echeance):
+    """(lignes retenues, lignes parcourues, interrompu)."""
+    log_reste = math.log(1 - taux)
+
+    def saut():
+        return int(math.log(_uniforme(rng)) / log_reste)
+
+    retenues = []
+    prochaine = saut()
+    i = -1
+    for i, ligne in enumerate(f):
+        if i == prochaine:
+            retenues.append(ligne)
+            prochaine += saut() + 1
+        if echeance is not None and not i & 0xFFF and time.perf_counter() > echeance:
+            return retenues, i + 1, True
+    return retenues, i + 1, False
+
+
+def _positions(f, debut, fin, taille, rng, echeance):
+    """(lignes retenues, lignes estimées du fichier, interrompu)."""
+    retenues, vues, octets = [], set(), 0
+    essais = 0
+    while len(retenues) < taille and essais < 4 * taille:
+        essais += 1
+        position = rng.randrange(debut, fin)
+        # La ligne retenue est la première qui commence à `position` ou après
+        f.seek(position - 1 if position > debut else debut)
+        if position > debut:
+            f.readline()
+        depart = f.tell()
+        ligne = f.readline()
+        if not ligne or depart in vues:
+            continue
+        vues.add(depart)
+        retenues.append(ligne)
+        octets += len(ligne)
+        if echeance is not None and time.perf_counter() > echeance:
+            break
+    interrompu = len(retenues) < taille
+    return retenues, round((fin - debut) * len(retenues) / max(octets, 1)), interrompu
+
+
+def echantillonner_csv(chemin, taille=TAILLE_ECHANTILLON, mode="positions", taux=None,
+                       graine=None, budget=None, encodage="utf-8", largeur_max=2):
+    """
+    Tire un échantillon des lignes numériques d'un fichier CSV.
+
+    `taille` est le nombre de lignes visé ; en mode ``bernoulli``, `taux`
+    (probabilité de retenir chaque ligne) le remplace s'il est donné.
+    Avec `budget` (secondes), la lecture s'arrête à l'échéance. Un
+    fichier qui ne contient pas plus de lignes que demandé est lu en
+    entier.
+
+    Retourne (données, informations) ; les informations donnent le mode,
+    la taille de l'échantillon, le nombre de lignes estimé du fichier,
+    `complet` (tout le fichier a été lu) et `interrompu` (budget épuisé).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode d'échantillonnage inconnu : '{mode}' (disponibles : {', '.join(MODES)})")
+    if taille < 1 and taux is None:
+        raise ValueError("La taille de l'échantillon doit être au moins 1")
+    if taux is not None and not 0 < taux <= 1:
+        raise ValueError("Le taux doit être compris entre 0 et 1")
+    rng = random.Random(graine)
+    echeance = time.perf_counter() + budget if budget is not None else None
+    dialecte = dialecte_fichier(chemin, encodage)
+    with open(chemin, mode="rb") as f:
+        if dialecte.entete:
+            f.readline()
+        debut = f.tell()
+        f.seek(0, 2)
+        fin = f.tell()
+        f.seek(debut)
+        estimees = (fin - debut) / _longueur_moyenne(f, debut)
+        if mode == "bernoulli":
+            taux = taux if taux is not None else min(1.0, taille / estimees)
+        complet = (taux == 1.0) if mode == "bernoulli" else estimees <= 2 * taille
+        if complet:
+            lignes, interrompu = None, False
+        elif mode == "reservoir":
+            lignes, lues, interrompu = _reservoir(f, taille, rng, echeance)
+            complet = lues <= taille and not interrompu
+        elif mode == "bernoulli":
+            lignes, lues, interrompu = _bernoulli(f, taux, rng, echeance)
+        else:
+            lignes, lues, interrompu = _positions(f, debut, fin, taille, rng, echeance)
+
+    if complet:
+        donnees = charger_csv(chemin, encodage=encodage, largeur_max=largeur_max)
+        lues = len(donnees)
+    else:
+        # La dernière ligne du fichier peut être sans fin de ligne
+        texte = b"".join(l if l.endswith(b"\n") else l + b"\n" for l in lignes).decode(encodage)
+        donnees = _ajouter_texte(_vide(dialecte, largeur_max), texte, dialecte, largeur_max)
+        if not len(donnees):
+            raise ValueError("Aucune donnée valide trouvée dans l'échantillon.")
+        if mode != "positions":
+            # Lignes parcourues → lignes valides, au prorata de l'échantillon
+            lues = round(lues * len(donnees) / len(lignes))
+    return donnees, {
+        "mode": mode,
+        "taille_echantillon": len(donnees),
+        "lignes_estimees": max(lues, len(donnees)),
+        "complet": complet,
+        "interrompu": interrompu,
+    }
+
+
+def _numerique(valeur):
+    return isinstance(valeur, (int, float)) and not isinstance(valeur, bool)
+
+
+def erreur_type(methode, echantillon, resultat, lignes_population=None,
+                repetitions=REPETITIONS_ERREUR, graine=None, processus=1):
+    """
+    Erreur type de `resultat` (calculé par `methode` sur `echantillon`),
+    estimée par bootstrap ; un tuple pour un résultat à plusieurs valeurs.
+
+    Avec `lignes_population`, la correction de population finie est
+    appliquée : l'erreur est nulle si l'échantillon couvre le fichier.
+    Retourne None pour un résultat structuré (matrice, dictionnaire) ou
+    un échantillon de moins de 2 lignes.
+    """
+    scalaire = _numerique(resultat)
+    if not scalaire and not (isinstance(resultat, tuple) and all(map(_numerique, resultat))):
+        return None
+    n = len(echantillon)
+    correction = math.sqrt(max(0.0, 1 - n / lignes_population)) if lignes_population else 1.0
+    if correction == 0.0:
+        return 0.0 if scalaire else tuple(0.0 for _ in resultat)
+    if n < 2:
+        return None
+    from stats_library.reechantillonnage import Bootstrap  # import circulaire
+    erreur = Bootstrap(methode, repetitions, graine=graine,
+                       processus=processus).calculer(echantillon)["erreur_type"]
+    if scalaire:
+        return erreur * correction
+    return tuple(e * correction for e in erreur)
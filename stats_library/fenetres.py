@@ -0,0 +1,143 @@
+"""
+Statistiques glissantes sur des données ordonnées.
+
+Chaque fenêtre de `fenetre` observations consécutives produit une
+valeur ; `pas` n'en garde qu'une toutes les `pas` positions. La fenêtre
+est mise à jour à chaque nouvelle observation au lieu d'être recalculée :
+
+- moyenne, écart-type, corrélation : ajout/retrait de Welford, O(1) ;
+- médiane : deux tas avec suppression différée, O(log w).
+
+`iterer(donnees)` produit les valeurs au fil de l'eau ; `calculer`
+retourne un tableau `array('d')`.
+"""
+
+import heapq
+from abc import abstractmethod
+from array import array
+from collections import deque
+from stats_library.core import MethodeStatistique
+from stats_library.accumulateurs import Moments
+from stats_library.donnees import extraire_colonnes
+from stats_library.strategies import Correlation, EcartType, Moyenne
+
+
+class MethodeGlissante(MethodeStatistique):
+    """Base des statistiques glissantes de taille `fenetre` et de pas `pas`."""
+
+    def __init__(self, fenetre, pas=1):
+        if fenetre < 1 or pas < 1:
+            raise ValueError("La fenêtre et le pas doivent être au moins 1")
+        self.fenetre = fenetre
+        self.pas = pas
+
+    def parametres(self):
+        return (("fenetre", self.fenetre), ("pas", self.pas))
+
+    def calculer(self, donnees):
+        return array('d', self.iterer(donnees))
+
+    @abstractmethod
+    def iterer(self, donnees):
+        pass
+
+    def _a_produire(self, position):
+        """Vrai si la fenêtre se terminant en `position` doit produire une valeur."""
+        debut = position - self.fenetre + 1
+        return debut >= 0 and debut % self.pas == 0
+
+
+class _MomentsGlissants(MethodeGlissante):
+    """Fenêtre glissante sur un accumulateur `Moments`, finalisé par `_methode`."""
+    _methode = None
+
+    def iterer(self, donnees):
+        colonnes = extraire_colonnes(donnees, self.dimension)
+        paires = zip(*colonnes) if self.dimension == 2 else ((x, 0.0) for x in colonnes[0])
+        fenetre = deque()
+        moments = Moments()
+        for position, (x, y) in enumerate(paires):
+            fenetre.append((x, y))
+            moments.ajouter_valeur(x, y)
+            if len(fenetre) > self.fenetre:
+                moments.retirer_valeur(*fenetre.popleft())
+            # Recalcul exact toutes les `fenetre` positions pour éviter la
+            # dérive des mises à jour (coût amorti O(1))
+            if position % self.fenetre == self.fenetre - 1:
+                x_fenetre = [p[0] for p in fenetre]
+                y_fenetre = [p[1] for p in fenetre] if self.dimension == 2 else None
+                moments = Moments.depuis_colonnes(x_fenetre, y_fenetre)
+            if self._a_produire(position):
+                yield self._methode.finaliser(moments)
+
+
+class MoyenneGlissante(_MomentsGlissants):
+    _methode = Moyenne()
+
+
+class EcartTypeGlissant(_MomentsGlissants):
+    _methode = EcartType()
+
+
+class CorrelationGlissante(_MomentsGlissants):
+    dimension = 2
+    _methode = Correlation()
+
+
+class MedianeGlissante(MethodeGlissante):
+    """
+    Médiane glissante par deux tas : `bas` (max-tas, moitié inférieure)
+    et `haut` (min-tas). Les éléments sortis de la fenêtre ne sont
+    retirés que lorsqu'ils arrivent au sommet d'un tas.
+    """
+    cout = "O(n log w)"
+
+    def iterer(self, donnees):
+        x, = extraire_colonnes(donnees, 1)
+        bas, haut = [], []  # bas : (-valeur, -position) ; haut : (valeur, position)
+        taille_bas = taille_haut = 0
+
+        def elaguer(debut):
+            while bas and -bas[0][1] < debut:
+                heapq.heappop(bas)
+            while haut and haut[0][1] < debut:
+                heapq.heappop(haut)
+
+        for position, valeur in enumerate(x):
+            debut = position - self.fenetre + 1
+            elaguer(debut - 1)
+            # Les couples (valeur, position) sont totalement ordonnés : tout
+            # élément de `bas` est inférieur à tout élément de `haut`
+            if not bas or (valeur, position) <= (-bas[0][0], -bas[0][1]):
+                heapq.heappush(bas, (-valeur, -position))
+                taille_bas += 1
+            else:
+                heapq.heappush(haut, (valeur, position))
+                taille_haut += 1
+
+            if debut > 0:
+                sortant = (x[debut - 1], debut - 1)
+                if bas and sortant <= (-bas[0][0], -bas[0][1]):
+                    taille_bas -= 1
+                else:
+                    taille_haut -= 1
+            elaguer(debut)
+
+            while taille_bas > taille_haut + 1:
+                v, p = heapq.heappop(bas)
+                heapq.heappush(haut, (-v, -p))
+                taille_bas -= 1
+                taille_haut += 1
+                elaguer(debut)
+            while taille_bas < taille_haut:
+                v, p = heapq.heappop(haut)
+                heapq.heappush(bas, (-v, -p))
+                taille_haut -= 1
+                taille_bas += 1
+                elaguer(debut)
+
+            if self._a_produire(position):
+                if self.fenetre % 2:
+                    yield -bas[0][0]
+                else:
+                    yield (-bas[0][0] + haut[0][0]) / 2
@@ -0,0 +1,147 @@
+"""
+Recalcul incrémental pour les fichiers CSV en ajout seul.
+
+Après une analyse, un fichier d'état ``<fichier>.etat`` conserve la
+position (en octets) de la fin de la dernière ligne lue, l'empreinte
+BLAKE2b du préfixe correspondant et l'état de la méthode (protocole
+incrémental : `Moments`, `Gram`, ...). À l'analyse suivante, seule la
+fin du fichier est lue et intégrée à l'état : moyenne, écart-type,
+corrélation et régression sont mises à jour en O(nouvelles lignes).
+
+Si le préfixe a changé (fichier modifié ou tronqué), ou si la méthode
+n'est plus la même, tout est recalculé.
+
+Le fichier d'état est sérialisé avec `pickle` : comme le cache binaire,
+il doit provenir d'une source de confiance (il est écrit par la
+bibliothèque, à côté des données).
+"""
+
+import hashlib
+import os
+import pickle
+from stats_library.chargement import TAILLE_PLAGE, _ajouter_texte, _vide, dialecte_fichier
+
+VERSION = 3
+EXTENSION = ".etat"
+
+
+def chemin_etat(chemin_source):
+    """Chemin du fichier d'état associé à un fichier source."""
+    return chemin_source + EXTENSION
+
+
+def signature(methode):
+    """Identifie une méthode (ou un plan) et ses paramètres."""
+    methodes = getattr(methode, "methodes", [methode])
+    return repr([(type(m).__module__, type(m).__qualname__,
+                  sorted(getattr(m, "__dict__", {}).items())) for m in methodes])
+
+
+def _empreinte_prefixe(chemin, longueur, taille_bloc=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(chemin, "rb") as f:
+        while longueur > 0:
+            bloc = f.read(min(taille_bloc, longueur))
+            if not bloc:
+                break
+            h.update(bloc)
+            longueur -= len(bloc)
+    return h.hexdigest()
+
+
+def _charger_etat(chemin, source, sig):
+    """État sauvegardé s'il est encore valable pour `source`, sinon None."""
+    try:
+        with open(chemin, "rb") as f:
+            sauvegarde = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if (not isinstance(sauvegarde, dict) or sauvegarde.get("version") != VERSION
+            or sauvegarde.get("signature") != sig):
+        return None
+    if os.path.getsize(source) < sauvegarde["decalage"]:
+        return None  # fichier tronqué
+    if _empreinte_prefixe(source, sauvegarde["decalage"]) != sauvegarde["empreinte"]:
+        return None  # préfixe modifié
+    return sauvegarde
+
+
+def _ecrire_etat(chemin, sauvegarde):
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as f:
+        pickle.dump(sauvegarde, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporaire, chemin)
+
+
+def _lire_suite(chemin, decalage, entete, dialecte, encodage, largeur_max):
+    """
+    Produit (bloc, position) pour les lignes complètes après `decalage` ;
+    `bloc` vaut None si un morceau ne contient aucune ligne valide.
+
+    La lecture se fait par morceaux alignés sur des fins de ligne ; une
+    dernière ligne sans fin de ligne (en cours d'écriture) n'est pas lue.
+    """
+    with open(chemin, "rb") as f:
+        f.seek(decalage)
+        if entete:
+            ligne = f.readline()  # ignorer en-tête si présent
+            if not ligne.endswith(b"\n"):
+                return
+            decalage += len(ligne)
+            yield None, decalage
+        reste = b""
+        while True:
+            morceau = f.read(TAILLE_PLAGE)
+            if not morceau:
+                return
+            morceau = reste + morceau
+            coupure = morceau.rfind(b"\n") + 1
+            reste = morceau[coupure:]
+            if not coupure:
+                continue
+            decalage += coupure
+            bloc = _ajouter_texte(_vide(dialecte, largeur_max), morceau[:coupure].decode(encodage),
+                                  dialecte, largeur_max)
+            yield (bloc if len(bloc) else None), decalage
+
+
+def analyser_csv_incremental(chemin, methode, encodage="utf-8", largeur_max=2):
+    """
+    Calcule l'état de `methode` sur un fichier CSV en ajout seul, en ne
+    lisant que les lignes ajoutées depuis l'analyse précédente.
+
+    `methode` doit suivre le protocole incrémental (une stratégie ou un
+    `PlanExecution`). Retourne (état, informations) ; les informations
+    indiquent le nombre total de lignes, le nombre de lignes lues et si
+    tout a été recalculé.
+    """
+    fichier_etat = chemin_etat(chemin)
+    sig = signature(methode)
+    sauvegarde = _charger_etat(fichier_etat, chemin, sig)
+    recalcul = sauvegarde is None
+    if recalcul:
+        sauvegarde = {"version": VERSION, "signature": sig, "decalage": 0,
+                      "dialecte": dialecte_fichier(chemin, encodage), "lignes": 0,
+                      "etat": methode.initialiser()}
+
+    etat, decalage, dialecte = sauvegarde["etat"], sauvegarde["decalage"], sauvegarde["dialecte"]
+    nouvelles = 0
+    entete = recalcul and dialecte.entete
+    for bloc, position in _lire_suite(chemin, decalage, entete, dialecte, encodage, largeur_max):
+        if bloc is not None:
+            etat = methode.mettre_a_jour(etat, bloc)
+            nouvelles += len(bloc)
+        decalage = position
+    if not sauvegarde["lignes"] + nouvelles:
+        raise ValueError("Aucune donnée valide trouvée dans le fichier.")
+
+    if recalcul or nouvelles or decalage != sauvegarde["decalage"]:
+        sauvegarde.update(etat=etat, decalage=decalage,
+                          lignes=sauvegarde["lignes"] + nouvelles,
+                          empreinte=_empreinte_prefixe(chemin, decalage))
+        try:
+            _ecrire_etat(fichier_etat, sauvegarde)
+        except OSError:
+            pass  # l'état est facultatif (répertoire en lecture seule, etc.)
+    return etat, {"lignes": sauvegarde["lignes"], "lignes_nouvelles": nouvelles,
+                  "recalcul_complet": recalcul}
@@ -0,0 +1,198 @@
+"""
+Persistance asynchrone du journal des calculs.
+
+Un puits reçoit les entrées brutes de `JournalCalculs` dans une file ;
+un fil d'exécution d'arrière-plan les regroupe par lots et les écrit
+sur disque. `enregistrer()` ne fait donc jamais d'entrée/sortie. Une
+erreur d'écriture est signalée sur la sortie d'erreur et comptée
+(`erreurs`) : le lot est perdu, mais le fil continue de vider la file.
+
+    journal = JournalCalculs()
+    journal.configurer(puits=PuitsJSONL("journal.jsonl"), recharger=True)
+"""
+
+import atexit
+import json
+import queue
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from stats_library.core import formater_entree
+
+_FIN = object()
+
+
+class PuitsJournal(ABC):
+    """Base des puits : file d'attente et fil d'écriture par lots."""
+
+    def __init__(self, taille_lot=256, delai=1.0):
+        self.taille_lot = taille_lot
+        self.delai = delai
+        self.erreurs = 0
+        self.derniere_erreur = None
+        self._file = queue.SimpleQueue()
+        self._fil = threading.Thread(target=self._boucle, name=type(self).__name__, daemon=True)
+        self._ferme = False
+        self._fil.start()
+        atexit.register(self.fermer)
+
+    def soumettre(self, entree):
+        """Ajoute une entrée brute à la file (appelé par le journal)."""
+        if not self._ferme:
+            self._file.put(entree)
+
+    def _signaler(self, erreur):
+        self.erreurs += 1
+        self.derniere_erreur = erreur
+        print(f"[ERREUR] {type(self).__name__} : {erreur}", file=sys.stderr)
+
+    def _boucle(self):
+        try:
+            self._ouvrir()
+            ouvert = True
+        except Exception as e:
+            # Les entrées sont alors consommées sans être écrites
+            self._signaler(e)
+            ouvert = False
+        try:
+            fin = False
+            while not fin:
+                lot = []
+                try:
+                    entree = self._file.get(timeout=self.delai)
+                except queue.Empty:
+                    continue
+                while entree is not _FIN:
+                    try:
+                        lot.append(dict(formater_entree(entree), horodatage=entree[0]))
+                    except Exception as e:
+                        self._signaler(e)
+                    if len(lot) >= self.taille_lot:
+                        break
+                    try:
+                        entree = self._file.get_nowait()
+                    except queue.Empty:
+                        break
+                fin = entree is _FIN
+                if lot and ouvert:
+                    try:
+                        self._ecrire(lot)
+                    except Exception as e:
+                        self._signaler(e)
+        finally:
+            if ouvert:
+                try:
+                    self._fermer()
+                except Exception as e:
+                    self._signaler(e)
+
+    def fermer(self):
+        """Vide la file, écrit les dernières entrées et arrête le fil."""
+        if self._ferme:
+            return
+        self._ferme = True
+        self._file.put(_FIN)
+        self._fil.join()
+
+    def _ouvrir(self):
+        pass
+
+    def _fermer(self):
+        pass
+
+    @abstractmethod
+    def _ecrire(self, lot):
+        """Écrit un lot d'entrées formatées (appelé par le fil d'écriture)."""
+
+    @abstractmethod
+    def charger(self, nombre):
+        """Retourne les `nombre` dernières entrées brutes persistées."""
+
+
+CHAMPS = ("date", "horodatage", "methode", "resultat", "status")
+
+
+def _brute(entree):
+    details = {cle: valeur for cle, valeur in entree.items() if cle not in CHAMPS}
+    return (entree["horodatage"], entree["methode"], entree["resultat"], entree["status"], details)
+
+
+class PuitsJSONL(PuitsJournal):
+    """Écrit une entrée JSON par ligne, en ajout."""
+
+    def __init__(self, chemin, **options):
+        self.chemin = chemin
+        super().__init__(**options)
+
+    def _ouvrir(self):
+        self._fichier = open(self.chemin, "a", encoding="utf-8")
+
+    def _fermer(self):
+        self._fichier.close()
+
+    def _ecrire(self, lot):
+        self._fichier.write("".join(
+            json.dumps(entree, ensure_ascii=False, default=str) + "\n" for entree in lot))
+        self._fichier.flush()
+
+    def charger(self, nombre):
+        try:
+            with open(self.chemin, encoding="utf-8") as f:
+                lignes = deque(f, maxlen=nombre)
+        except FileNotFoundError:
+            return []
+        entrees = []
+        for ligne in lignes:
+            try:
+                entrees.append(_brute(json.loads(ligne)))
+            except (ValueError, KeyError):
+                continue  # ligne tronquée (arrêt brutal pendant une écriture)
+        return entrees
+
+
+class PuitsSQLite(PuitsJournal):
+    """Écrit les entrées dans une table SQLite `journal`."""
+
+    CREATION = ("CREATE TABLE IF NOT EXISTS journal ("
+                "horodatage REAL, date TEXT, methode TEXT, resultat TEXT, status TEXT, "
+                "details TEXT)")
+
+    def _creer_table(self, connexion):
+        connexion.execute(self.CREATION)
+        colonnes = {ligne[1] for ligne in connexion.execute("PRAGMA table_info(journal)")}
+        if "details" not in colonnes:  # table créée par une version précédente
+            connexion.execute("ALTER TABLE journal ADD COLUMN details TEXT")
+
+    def __init__(self, chemin, **options):
+        self.chemin = chemin
+        super().__init__(**options)
+
+    def _ouvrir(self):
+        # La connexion appartient au fil d'écriture
+        self._connexion = sqlite3.connect(self.chemin)
+        self._creer_table(self._connexion)
+
+    def _fermer(self):
+        self._connexion.close()
+
+    def _ecrire(self, lot):
+        with self._connexion:
+            self._connexion.executemany(
+                "INSERT INTO journal VALUES (?, ?, ?, ?, ?, ?)",
+                [(e["horodatage"], e["date"], e["methode"],
+                  json.dumps(e["resultat"], default=str), e["status"],
+                  json.dumps(_brute(e)[4], default=str)) for e in lot])
+
+    def charger(self, nombre):
+        connexion = sqlite3.connect(self.chemin)
+        try:
+            self._creer_table(connexion)
+            lignes = connexion.execute(
+                "SELECT horodatage, methode, resultat, status, details FROM journal "
+                "ORDER BY rowid DESC LIMIT ?", (nombre,)).fetchall()
+        finally:
+            connexion.close()
+        return [(h, m, json.loads(r), s, json.loads(d) if d else {})
+                for h, m, r, s, d in reversed(lignes)]
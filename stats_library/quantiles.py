@@ -0,0 +1,167 @@
+"""
+Moteur de quantiles.
+
+- Quantiles exacts par sélection (introselect, O(n) en moyenne) au lieu
+  d'un tri complet ; le moteur NumPy utilise `numpy.partition` (voir
+  `stats_library.backends`).
+- Quantiles approchés en mémoire bornée avec le croquis KLL
+  (Karnin, Lang, Liberty), fusionnable entre blocs ou processus.
+"""
+
+import math
+import random
+
+from stats_library.backends import choisir_backend
+
+# En dessous de cette taille, le tri (en C) est plus rapide que la sélection
+SEUIL_TRI = 64
+
+
+def _selectionner(valeurs, rangs, profondeur_max):
+    """
+    Retourne {rang: valeur} pour chaque rang (0-based, triés) de `valeurs`.
+
+    Partition en trois (inférieur, égal, supérieur) autour d'un pivot
+    médian de trois ; on ne descend que dans les parties contenant des
+    rangs demandés. Au-delà de `profondeur_max`, on trie la partie
+    restante (garantie O(n log n) dans le pire cas).
+    """
+    resultat = {}
+    pile = [(valeurs, 0, rangs, 0)]
+    while pile:
+        partie, decalage, demandes, profondeur = pile.pop()
+        if len(partie) <= SEUIL_TRI or profondeur >= profondeur_max:
+            triee = sorted(partie)
+            for rang in demandes:
+                resultat[rang] = triee[rang - decalage]
+            continue
+
+        a, b, c = partie[0], partie[len(partie) // 2], partie[-1]
+        pivot = sorted((a, b, c))[1]
+        inferieurs = [v for v in partie if v < pivot]
+        superieurs = [v for v in partie if v > pivot]
+        debut_egaux = decalage + len(inferieurs)
+        fin_egaux = decalage + len(partie) - len(superieurs)
+
+        gauche = [r for r in demandes if r < debut_egaux]
+        droite = [r for r in demandes if r >= fin_egaux]
+        for rang in demandes:
+            if debut_egaux <= rang < fin_egaux:
+                resultat[rang] = pivot
+        if gauche:
+            pile.append((inferieurs, decalage, gauche, profondeur + 1))
+        if droite:
+            pile.append((superieurs, fin_egaux, droite, profondeur + 1))
+    return resultat
+
+
+def introselect(valeurs, rangs):
+    """{rang: valeur} pour des rangs 0-based, par introselect (sans NumPy)."""
+    n = len(valeurs)
+    profondeur_max = 2 * max(1, int(math.log2(n))) if n else 1
+    return _selectionner(valeurs, sorted(rangs), profondeur_max)
+
+
+def selectionner(valeurs, rangs):
+    """Valeurs de rangs donnés (0-based) comme si `valeurs` était trié."""
+    return choisir_backend(valeurs).selectionner(valeurs, sorted(set(rangs)))
+
+
+def quantiles_exacts(valeurs, probabilites):
+    """
+    Quantiles exacts avec interpolation linéaire entre rangs voisins
+    (même convention que la médiane : moyenne des deux valeurs centrales).
+    """
+    n = len(valeurs)
+    positions = []
+    for p in probabilites:
+        if not 0 <= p <= 1:
+            raise ValueError("Les probabilités doivent être comprises entre 0 et 1")
+        h = (n - 1) * p
+        bas = int(math.floor(h))
+        positions.append((bas, min(bas + 1, n - 1), h - bas))
+    rangs = {r for bas, haut, _ in positions for r in (bas, haut)}
+    valeurs_rangs = selectionner(valeurs, rangs)
+    resultats = []
+    for bas, haut, fraction in positions:
+        v_bas, v_haut = valeurs_rangs[bas], valeurs_rangs[haut]
+        resultats.append(v_bas + (v_haut - v_bas) * fraction if fraction else v_bas)
+    return resultats
+
+
+class CroquisKLL:
+    """
+    Croquis KLL : quantiles approchés en mémoire O(k log(n/k)).
+
+    L'erreur de rang est de l'ordre de 1.7 / k (k=200 : ~1 %).
+    Deux croquis construits sur des blocs différents se fusionnent.
+    """
+
+    def __init__(self, k=200, graine=None):
+        if k < 8:
+            raise ValueError("k doit être au moins 8")
+        self.k = k
+        self.n = 0
+        self.niveaux = [[]]
+        self._aleatoire = random.Random(graine)
+
+    def _capacite(self, niveau):
+        profondeur = len(self.niveaux) - niveau - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** profondeur)))
+
+    def _compresser(self):
+        niveau = 0
+        while niveau < len(self.niveaux):
+            if len(self.niveaux[niveau]) >= self._capacite(niveau):
+                if niveau + 1 == len(self.niveaux):
+                    self.niveaux.append([])
+                valeurs = sorted(self.niveaux[niveau])
+                # Un élément isolé reste au niveau courant si l'effectif est impair
+                reste = [valeurs.pop()] if len(valeurs) % 2 else []
+                decalage = self._aleatoire.randint(0, 1)
+                self.niveaux[niveau + 1].extend(valeurs[decalage::2])
+                self.niveaux[niveau] = reste
+                niveau = 0  # les capacités ont pu changer
+            else:
+                niveau += 1
+
+    def ajouter(self, valeurs):
+        """Ajoute une séquence de valeurs au croquis."""
+        self.niveaux[0].extend(valeurs)
+        self.n += len(valeurs)
+        self._compresser()
+        return self
+
+    def fusionner(self, autre):
+        """Intègre un autre croquis dans celui-ci."""
+        while len(self.niveaux) < len(autre.niveaux):
+            self.niveaux.append([])
+        for niveau, valeurs in enumerate(autre.niveaux):
+            self.niveaux[niveau].extend(valeurs)
+        self.n += autre.n
+        self._compresser()
+        return self
+
+    def quantiles(self, probabilites):
+        """Quantiles approchés pour chaque probabilité demandée."""
+        if not self.n:
+            return [0 for _ in probabilites]
+        ponderees = sorted((v, 1 << niveau)
+                           for niveau, valeurs in enumerate(self.niveaux)
+                           for v in valeurs)
+        total = sum(poids for _, poids in ponderees)
+        resultats = []
+        for p in probabilites:
+            cible = p * total
+            cumul = 0
+            valeur = ponderees[-1][0]
+            for v, poids in ponderees:
+                cumul += poids
+                if cumul >= cible:
+                    valeur = v
+                    break
+            resultats.append(valeur)
+        return resultats
+
+    def __len__(self):
+        return sum(len(valeurs) for valeurs in self.niveaux)
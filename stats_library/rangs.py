@@ -0,0 +1,187 @@
+"""
+Rangs et concordance des paires (x, y), pour les corrélations de rang.
+
+`Classement` réunit ce dont ont besoin les corrélations de Spearman et
+de Kendall : rangs moyens (ex aequo compris) des deux variables,
+nombres de paires ex aequo et nombre d'échanges de l'algorithme de
+Knight. Il est calculé une fois et partagé par les deux statistiques ;
+le nombre d'échanges, qui ne sert qu'à Kendall, n'est compté qu'à sa
+première lecture.
+
+Algorithme de Knight (1966) : les lignes sont triées par (x, y) en
+O(n log n) ; le nombre de paires discordantes est alors le nombre
+d'échanges d'un tri fusion des y dans cet ordre (paires i < j avec
+y_i > y_j). Le tri fusion est ascendant : à chaque niveau, les échanges
+entre deux segments triés voisins sont comptés par recherche dichotomique
+(`bisect`, O(n log n) par niveau, soit O(n log² n) au total), puis les
+segments sont fusionnés par `list.sort`, qui reconnaît les deux séquences
+déjà triées.
+
+Le calcul est délégué au moteur choisi par `stats_library.backends`.
+"""
+
+import itertools
+import operator
+from array import array
+from bisect import bisect_right
+
+from stats_library.backends import choisir_backend
+
+# Taille des segments triés par insertion avant les fusions
+TAILLE_SEGMENT = 32
+
+
+def _effectifs(triees):
+    """Effectifs des groupes de valeurs égales d'une suite triée."""
+    n = len(triees)
+    debuts = list(itertools.compress(range(n), map(operator.ne, triees, [None] + triees[:-1])))
+    return list(map(operator.sub, debuts[1:] + [n], debuts))
+
+
+def _ex_aequo(effectifs):
+    """Nombre de paires ex aequo, Σ t(t-1)/2."""
+    return sum(t * (t - 1) // 2 for t in effectifs if t > 1)
+
+
+def _rangs_moyens(ordre, effectifs):
+    """Rangs (1 à n, moyenne pour les ex aequo) des lignes, dans l'ordre d'origine."""
+    n = len(ordre)
+    if len(effectifs) == n:
+        par_position = range(1, n + 1)
+    else:
+        par_position, debut = [], 0
+        for t in effectifs:
+            par_position.extend(itertools.repeat(debut + (t + 1) / 2, t))
+            debut += t
+    rangs = array('d', bytes(8 * n))
+    for i, rang in zip(ordre, par_position):
+        rangs[i] = rang
+    return rangs
+
+
+def compter_echanges(sequence):
+    """Nombre de paires i < j avec sequence[i] > sequence[j], par tri fusion."""
+    echanges = 0
+    segments = []
+    for debut in range(0, len(sequence), TAILLE_SEGMENT):
+        segment = []
+        for v in sequence[debut:debut + TAILLE_SEGMENT]:
+            k = bisect_right(segment, v)
+            echanges += len(segment) - k
+            segment.insert(k, v)
+        segments.append(segment)
+    while len(segments) > 1:
+        suivants = []
+        for i in range(0, len(segments) - 1, 2):
+            gauche, droite = segments[i], segments[i + 1]
+            # Pour chaque valeur de droite : valeurs de gauche strictement supérieures
+            inferieures = sum(map(bisect_right, itertools.repeat(gauche, len(droite)), droite))
+            echanges += len(gauche) * len(droite) - inferieures
+            gauche += droite
+            gauche.sort()
+            suivants.append(gauche)
+        if len(segments) % 2:
+            suivants.append(segments[-1])
+        segments = suivants
+    return echanges
+
+
+def classer(x, y):
+    """
+    Référence Python : (rangs_x, rangs_y, ex aequo en x, en y, en (x, y),
+    y dans l'ordre (x, y)), pour des colonnes d'au moins une valeur.
+    """
+    ordre_y = sorted(range(len(y)), key=y.__getitem__)
+    # Ordre (x, y) : tri stable des x dans l'ordre des y, qui est réutilisé
+    ordre_x = sorted(ordre_y, key=x.__getitem__)
+    x_tries = [x[i] for i in ordre_x]
+    y_selon_x = [y[i] for i in ordre_x]
+    effectifs_x = _effectifs(x_tries)
+    effectifs_y = _effectifs([y[i] for i in ordre_y])
+    liens_x = _ex_aequo(effectifs_x)
+    # Des paires ex aequo en (x, y) le sont d'abord en x
+    liens_xy = _ex_aequo(_effectifs(list(zip(x_tries, y_selon_x)))) if liens_x else 0
+    return (_rangs_moyens(ordre_x, effectifs_x), _rangs_moyens(ordre_y, effectifs_y),
+            liens_x, _ex_aequo(effectifs_y), liens_xy, y_selon_x)
+
+
+class Classement:
+    """Rangs moyens et comptes de Knight d'une série de paires (x, y)."""
+    __slots__ = ("n", "rangs_x", "rangs_y", "liens_x", "liens_y", "liens_xy",
+                 "_suite", "_echanges", "_backend")
+
+    def __init__(self):
+        self.n = 0
+        self.rangs_x = array('d')
+        self.rangs_y = array('d')
+        self.liens_x = 0    # paires ex aequo en x
+        self.liens_y = 0    # paires ex aequo en y
+        self.liens_xy = 0   # paires ex aequo en x et en y
+        self._suite = None  # y dans l'ordre (x, y), pour le compte des échanges
+        self._echanges = 0
+        self._backend = None
+
+    @classmethod
+    def depuis_colonnes(cls, x, y):
+        """Classe des colonnes entières (un seul tri par variable)."""
+        classement = cls()
+        classement.n = len(x)
+        if classement.n:
+            classement._backend = choisir_backend(x)
+            (classement.rangs_x, classement.rangs_y, classement.liens_x, classement.liens_y,
+             classement.liens_xy, classement._suite) = classement._backend.classement(x, y)
+        return classement
+
+    @property
+    def echanges(self):
+        """Paires discordantes, comptées à la première lecture (Kendall seulement)."""
+        if self._suite is not None:
+            self._echanges = self._backend.echanges(self._suite)
+            self._suite = None
+        return self._echanges
+
+    def __repr__(self):
+        return f"Classement(n={self.n})"
+
+
+class Paires:
+    """
+    État incrémental des méthodes de rang : les valeurs sont conservées
+    (mémoire O(n)), le classement n'est calculé qu'à la finalisation,
+    une seule fois pour toutes les méthodes qui partagent l'état.
+    """
+    __slots__ = ("x", "y", "_classement")
+
+    def __init__(self):
+        self.x = array('d')
+        self.y = array('d')
+        self._classement = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def ajouter_colonnes(self, x, y):
+        self.x.extend(x)
+        self.y.extend(y)
+        self._classement = None
+        return self
+
+    def fusionner(self, autre):
+        """Ajoute les paires d'un autre état à celui-ci."""
+        return self.ajouter_colonnes(autre.x, autre.y)
+
+    def classement(self):
+        if self._classement is None:
+            self._classement = Classement.depuis_colonnes(self.x, self.y)
+        return self._classement
+
+    def __getstate__(self):
+        # Le classement se recalcule : il n'est pas sérialisé
+        return self.x, self.y
+
+    def __setstate__(self, etat):
+        self.x, self.y = etat
+        self._classement = None
+
+    def __repr__(self):
+        return f"Paires(n={len(self.x)})"
@@ -0,0 +1,280 @@
+"""
+Rééchantillonnage : intervalles de confiance bootstrap et tests de
+permutation, autour de n'importe quelle `MethodeStatistique`.
+
+Les réplicats sont produits par lots de `taille_lot`. Chaque lot a sa
+propre graine, dérivée de `graine` et du numéro du lot : les résultats
+sont reproductibles quel que soit le nombre de processus. Les lots sont
+répartis sur un pool de processus ; les données ne sont envoyées
+qu'une fois à chaque processus.
+
+Avec NumPy, les indices d'un lot sont tirés d'un seul coup (matrice
+lot × n). Pour les méthodes déduites des moments (`MethodeParMoments`),
+les indices sont convertis en poids (nombre de tirages de chaque
+ligne) : les moments de tous les réplicats du lot s'obtiennent par un
+produit matriciel avec les colonnes centrées, puis sont finalisés par
+la méthode. Sinon, chaque réplicat est calculé par `calculer`.
+"""
+
+import math
+import operator
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from stats_library.core import MethodeStatistique
+from stats_library.accumulateurs import Moments
+from stats_library.donnees import Colonnes, extraire_colonnes
+from stats_library.quantiles import quantiles_exacts
+from stats_library.strategies import Correlation, MethodeParMoments
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel
+    np = None
+
+# Nombre maximal d'indices tirés par lot (matrice lot × n)
+VALEURS_PAR_LOT = 1 << 22
+
+# Données et méthode du processus de travail (voir `_initialiser`)
+_travail = {}
+
+
+def _initialiser(colonnes, methode):
+    _travail["colonnes"] = colonnes
+    _travail["methode"] = methode
+
+
+def _generateur(graine, lot):
+    if np is not None:
+        return np.random.default_rng([graine, lot])
+    return random.Random(f"{graine}:{lot}")
+
+
+def _etats_moments(n, mx, my, m2x, m2y, cxy):
+    """Un état `Moments` par réplicat, à partir de vecteurs NumPy."""
+    etats = []
+    for valeurs in zip(mx.tolist(), my.tolist(), m2x.tolist(), m2y.tolist(), cxy.tolist()):
+        etat = Moments()
+        etat.n = n
+        etat.moyenne_x, etat.moyenne_y, etat.m2_x, etat.m2_y, etat.c_xy = valeurs
+        etats.append(etat)
+    return etats
+
+
+def _moments_lot(x, y):
+    """Moments de chaque ligne de deux matrices lot × n."""
+    mx, my = x.mean(axis=1), y.mean(axis=1)
+    dx, dy = x - mx[:, None], y - my[:, None]
+    return _etats_moments(x.shape[1], mx, my, np.einsum("ij,ij->i", dx, dx),
+                          np.einsum("ij,ij->i", dy, dy), np.einsum("ij,ij->i", dx, dy))
+
+
+def _moments_ponderes(colonnes, indices):
+    """
+    Moments de chaque réplicat d'un lot d'indices, sans copier les
+    lignes tirées : chaque ligne est pondérée par son nombre de tirages.
+    Les colonnes sont d'abord centrées sur leur moyenne, ce qui évite
+    la perte de précision de la formule Σw·x² − n·x̄².
+    """
+    taille, n = indices.shape
+    decalages = np.arange(taille)[:, None] * n
+    poids = np.bincount((indices + decalages).ravel(), minlength=taille * n)
+    poids = poids.reshape(taille, n).astype(np.float64)
+    x = colonnes[0]
+    y = colonnes[1] if len(colonnes) > 1 else np.zeros(n)
+    cx, cy = x - x.mean(), y - y.mean()
+    sommes = poids @ np.column_stack([cx, cy, cx * cx, cy * cy, cx * cy])
+    mx, my = sommes[:, 0] / n, sommes[:, 1] / n
+    return _etats_moments(n, x.mean() + mx, y.mean() + my, sommes[:, 2] - n * mx * mx,
+                          sommes[:, 3] - n * my * my, sommes[:, 4] - n * mx * my)
+
+
+def _lot_bootstrap(lot, taille, graine, colonnes=None, methode=None):
+    """Réplicats bootstrap d'un lot (tirage avec remise des lignes)."""
+    colonnes = colonnes if colonnes is not None else _travail["colonnes"]
+    methode = methode if methode is not None else _travail["methode"]
+    n = len(colonnes[0])
+    rng = _generateur(graine, lot)
+    if np is not None:
+        indices = rng.integers(0, n, size=(taille, n))
+        if isinstance(methode, MethodeParMoments):
+            return [methode.finaliser(e) for e in _moments_ponderes(colonnes, indices)]
+        tirees = [c[indices] for c in colonnes]
+        return [methode.calculer(Colonnes([t[i] for t in tirees])) for i in range(taille)]
+    resultats = []
+    lignes = range(n)
+    for _ in range(taille):
+        lire = operator.itemgetter(*rng.choices(lignes, k=n))
+        resultats.append(methode.calculer(Colonnes([array('d', lire(c)) for c in colonnes])))
+    return resultats
+
+
+def _lot_permutation(lot, taille, graine, colonnes=None, methode=None):
+    """Statistiques d'un lot de permutations de la dernière colonne."""
+    colonnes = colonnes if colonnes is not None else _travail["colonnes"]
+    methode = methode if methode is not None else _travail["methode"]
+    *fixes, y = colonnes
+    n = len(y)
+    rng = _generateur(graine, lot)
+    if np is not None:
+        permutees = rng.permuted(np.broadcast_to(y, (taille, n)), axis=1)
+        if isinstance(methode, MethodeParMoments) and len(fixes) == 1:
+            x = np.broadcast_to(fixes[0], (taille, n))
+            return [methode.finaliser(e) for e in _moments_lot(x, permutees)]
+        return [methode.calculer(Colonnes(fixes + [p])) for p in permutees]
+    resultats = []
+    for _ in range(taille):
+        permutee = array('d', y)
+        rng.shuffle(permutee)
+        resultats.append(methode.calculer(Colonnes(fixes + [permutee])))
+    return resultats
+
+
+class _Reechantillonnage(MethodeStatistique):
+    """Base : données en tampons, découpage en lots et pool de processus."""
+    fusionnable = False
+    cout = "O(B·n)"
+
+    def __init__(self, methode, repetitions, graine, processus, taille_lot):
+        if repetitions < 1:
+            raise ValueError("Le nombre de répétitions doit être au moins 1")
+        self.methode = methode
+        self.repetitions = repetitions
+        self.graine = graine
+        self.processus = processus
+        self.taille_lot = taille_lot
+        self.dimension = methode.dimension
+        self.toutes_colonnes = methode.toutes_colonnes
+
+    @property
+    def deterministe(self):
+        # Sans graine, chaque appel tire de nouveaux réplicats
+        return self.graine is not None and self.methode.deterministe
+
+    def parametres(self):
+        # Le découpage en lots fixe les graines de chaque lot : il compte
+        classe = type(self.methode)
+        return (("methode", classe.__module__, classe.__qualname__, self.methode.parametres()),
+                ("repetitions", self.repetitions), ("graine", self.graine),
+                ("taille_lot", self.taille_lot))
+
+    def _colonnes(self, donnees):
+        colonnes = extraire_colonnes(donnees, None if self.toutes_colonnes else self.dimension)
+        if np is not None:
+            return [np.asarray(c, dtype=np.float64) for c in colonnes]
+        return [c if isinstance(c, array) else array('d', c) for c in colonnes]
+
+    def _replicats(self, fonction, colonnes):
+        n = len(colonnes[0])
+        taille_lot = self.taille_lot or max(1, min(self.repetitions, VALEURS_PAR_LOT // max(n, 1)))
+        # Sans graine, une graine aléatoire est tirée une fois pour tous les lots
+        graine = self.graine if self.graine is not None else random.SystemRandom().getrandbits(64)
+        lots = [(i, min(taille_lot, self.repetitions - debut), graine)
+                for i, debut in enumerate(range(0, self.repetitions, taille_lot))]
+        processus = min(self.processus or os.cpu_count() or 1, len(lots))
+        if processus == 1:
+            resultats = [fonction(*lot, colonnes, self.methode) for lot in lots]
+        else:
+            with ProcessPoolExecutor(max_workers=processus, initializer=_initialiser,
+                                     initargs=(colonnes, self.methode)) as pool:
+                resultats = list(pool.map(fonction, *zip(*lots)))
+        return [r for lot in resultats for r in lot]
+
+
+class Bootstrap(_Reechantillonnage):
+    """
+    Intervalle de confiance bootstrap (percentiles) d'une méthode.
+
+    Retourne un dictionnaire : `estimation` (sur les données), `intervalle`
+    (bas, haut) au niveau `niveau`, `erreur_type` et `repetitions`. Pour
+    une méthode à plusieurs résultats (régression : pente, intercept),
+    `intervalle` et `erreur_type` sont des tuples, un élément par résultat.
+    """
+
+    def __init__(self, methode, repetitions=1000, niveau=0.95, graine=None,
+                 processus=None, taille_lot=None):
+        super().__init__(methode, repetitions, graine, processus, taille_lot)
+        if not 0 < niveau < 1:
+            raise ValueError("Le niveau doit être compris entre 0 et 1")
+        self.niveau = niveau
+
+    def parametres(self):
+        return super().parametres() + (("niveau", self.niveau),)
+
+    def calculer(self, donnees):
+        colonnes = self._colonnes(donnees)
+        if len(colonnes[0]) < 2:
+            raise ValueError("Le bootstrap nécessite au moins 2 observations")
+        estimation = self.methode.calculer(donnees)
+        replicats = self._replicats(_lot_bootstrap, colonnes)
+        alpha = (1 - self.niveau) / 2
+
+        def resumer(valeurs):
+            moyenne = math.fsum(valeurs) / len(valeurs)
+            ecart = math.sqrt(math.fsum((v - moyenne) ** 2 for v in valeurs) / max(len(valeurs) - 1, 1))
+            return tuple(quantiles_exacts(valeurs, [alpha, 1 - alpha])), ecart
+
+        if isinstance(estimation, tuple):
+            resumes = [resumer([r[i] for r in replicats]) for i in range(len(estimation))]
+            intervalle = tuple(r[0] for r in resumes)
+            erreur_type = tuple(r[1] for r in resumes)
+        else:
+            intervalle, erreur_type = resumer(replicats)
+        return {
+            "estimation": estimation,
+            "intervalle": intervalle,
+            "erreur_type": erreur_type,
+            "repetitions": self.repetitions,
+        }
+
+
+class TestPermutation(_Reechantillonnage):
+    """
+    Test de permutation : p-valeur de la statistique de `methode` (par
+    défaut la corrélation) sous l'hypothèse d'indépendance, obtenue en
+    permutant la dernière colonne.
+
+    `alternative` : "bilaterale", "superieure" ou "inferieure". Pour une
+    méthode à plusieurs résultats, `composante` désigne celui testé
+    (0 : la pente d'une régression). Retourne `statistique`, `p_valeur`
+    et `permutations`.
+    """
+    ALTERNATIVES = ("bilaterale", "superieure", "inferieure")
+
+    def __init__(self, methode=None, permutations=10000, alternative="bilaterale",
+                 composante=0, graine=None, processus=None, taille_lot=None):
+        super().__init__(methode or Correlation(), permutations, graine, processus, taille_lot)
+        if self.dimension < 2:
+            raise ValueError("Le test de permutation nécessite une méthode à 2 colonnes")
+        if alternative not in self.ALTERNATIVES:
+            raise ValueError(f"Alternative inconnue : '{alternative}'")
+        self.alternative = alternative
+        self.composante = composante
+
+    def parametres(self):
+        return super().parametres() + (("alternative", self.alternative),
+                                       ("composante", self.composante))
+
+    def _valeur(self, resultat):
+        return resultat[self.composante] if isinstance(resultat, tuple) else resultat
+
+    def calculer(self, donnees):
+        colonnes = self._colonnes(donnees)
+        if len(colonnes[0]) < 2:
+            raise ValueError("Le test de permutation nécessite au moins 2 observations")
+        statistique = self._valeur(self.methode.calculer(donnees))
+        permutees = [self._valeur(r) for r in self._replicats(_lot_permutation, colonnes)]
+        # Tolérance relative : une permutation identique doit compter comme extrême
+        marge = 1e-12 * max(abs(statistique), 1.0)
+        if self.alternative == "superieure":
+            extremes = sum(1 for v in permutees if v >= statistique - marge)
+        elif self.alternative == "inferieure":
+            extremes = sum(1 for v in permutees if v <= statistique + marge)
+        else:
+            extremes = sum(1 for v in permutees if abs(v) >= abs(statistique) - marge)
+        return {
+            "statistique": statistique,
+            "p_valeur": (extremes + 1) / (len(permutees) + 1),
+            "permutations": self.repetitions,
+        }
@@ -0,0 +1,155 @@
+"""
+Registre des méthodes statistiques.
+
+Chaque méthode est enregistrée sous un nom court (`moyenne`,
+`correlation`, ...) avec un libellé et ses paramètres par défaut. La
+classe n'est importée qu'au premier usage, et ses capacités (voir
+`MethodeStatistique`) servent à planifier l'exécution : fusion des
+passages, lecture en flux plutôt que chargement en mémoire, etc.
+
+Les méthodes de bibliothèques tierces sont découvertes, à la première
+consultation du registre, par le point d'entrée ``stats_library.methodes`` :
+
+    [project.entry-points."stats_library.methodes"]
+    ma_methode = "mon_paquet.module:MaMethode"
+"""
+
+import importlib
+import threading
+
+GROUPE_POINTS_ENTREE = "stats_library.methodes"
+# Attributs de `MethodeStatistique` qui déclarent les capacités
+ATTRIBUTS_CAPACITES = ("dimension", "flux", "fusionnable", "cout", "toutes_colonnes")
+
+
+def capacites(methode):
+    """Capacités déclarées d'une méthode (instance, ou classe sans propriété)."""
+    return {
+        "paires": methode.dimension >= 2,
+        "flux": bool(methode.flux),
+        "fusionnable": bool(methode.fusionnable),
+        "cout": methode.cout,
+        "toutes_colonnes": bool(methode.toutes_colonnes),
+    }
+
+
+class EntreeRegistre:
+    """Méthode enregistrée : la classe est chargée au premier accès."""
+
+    def __init__(self, nom, cible, libelle=None, parametres=()):
+        self.nom = nom
+        self._cible = cible  # classe, ou chemin "module:Classe"
+        self.libelle = libelle or nom
+        self.parametres = tuple(parametres)
+        self._capacites = None
+
+    @property
+    def classe(self):
+        if isinstance(self._cible, str):
+            module, _, attribut = self._cible.partition(":")
+            self._cible = getattr(importlib.import_module(module), attribut)
+        return self._cible
+
+    def creer(self):
+        return self.classe(*self.parametres)
+
+    @property
+    def capacites(self):
+        """
+        Capacités de la méthode, lues sur la classe ; une instance n'est
+        créée (une seule fois) que si une capacité dépend des paramètres
+        (propriété, comme `Quantile.flux`).
+        """
+        if self._capacites is None:
+            classe = self.classe
+            dynamique = any(isinstance(getattr(classe, attribut, None), property)
+                            for attribut in ATTRIBUTS_CAPACITES)
+            self._capacites = capacites(self.creer() if dynamique else classe)
+        return self._capacites
+
+    def __repr__(self):
+        return f"EntreeRegistre({self.nom!r}, {self.libelle!r})"
+
+
+class Registre:
+    """Noms courts des méthodes, dans l'ordre d'enregistrement."""
+
+    def __init__(self, groupe=GROUPE_POINTS_ENTREE):
+        self._entrees = {}
+        self._groupe = groupe
+        self._decouverts = False
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, nom, cible, libelle=None, parametres=()):
+        """Enregistre une méthode (classe ou chemin "module:Classe")."""
+        self._entrees[nom.lower()] = EntreeRegistre(nom.lower(), cible, libelle, parametres)
+
+    def _decouvrir(self):
+        """Enregistre les méthodes déclarées par points d'entrée (une fois)."""
+        with self._verrou:
+            if self._decouverts:
+                return
+            self._decouverts = True
+            try:
+                from importlib.metadata import entry_points
+            except ImportError:  # Python < 3.8
+                return
+            try:
+                points = entry_points(group=self._groupe)
+            except TypeError:  # Python < 3.10
+                points = entry_points().get(self._groupe, [])
+            for point in points:
+                # Le module n'est importé qu'au premier usage de la méthode
+                self._entrees.setdefault(point.name.lower(),
+                                         EntreeRegistre(point.name.lower(), point.value))
+
+    def noms(self):
+        self._decouvrir()
+        return list(self._entrees)
+
+    def entrees(self):
+        self._decouvrir()
+        return list(self._entrees.values())
+
+    def obtenir(self, nom):
+        cle = nom.strip().lower()
+        if cle not in self._entrees:
+            self._decouvrir()
+        try:
+            return self._entrees[cle]
+        except KeyError:
+            raise ValueError(
+                f"Méthode inconnue : '{nom}' (disponibles : {', '.join(self.noms())})")
+
+    def creer(self, nom):
+        """Instancie la méthode `nom` avec ses paramètres par défaut."""
+        return self.obtenir(nom).creer()
+
+    def __contains__(self, nom):
+        try:
+            self.obtenir(nom)
+        except ValueError:
+            return False
+        return True
+
+
+REGISTRE = Registre()
+for _nom, _cible, _libelle, _parametres in (
+    ("moyenne", "Moyenne", "Moyenne", ()),
+    ("mediane", "Mediane", "Médiane", ()),
+    ("ecart_type", "EcartType", "Écart-Type", ()),
+    ("correlation", "Correlation", "Corrélation", ()),
+    ("regression", "RegressionLineaire", "Régression Linéaire", ()),
+    ("spearman", "Spearman", "Corrélation de Spearman", ()),
+    ("kendall", "Kendall", "Tau de Kendall", ()),
+    ("quartiles", "Quantile", "Quartiles", ((0.25, 0.5, 0.75),)),
+    ("matrice_covariance", "MatriceCovariance", "Matrice de covariance", ()),
+    ("matrice_correlation", "MatriceCorrelation", "Matrice de corrélation", ()),
+    ("regression_multiple", "RegressionMultiple", "Régression multiple", ()),
+):
+    REGISTRE.enregistrer(_nom, f"stats_library.strategies:{_cible}", _libelle, _parametres)
+
+
+def methode_par_nom(nom):
+    """Instancie une méthode à partir de son nom court."""
+    return REGISTRE.creer(nom)
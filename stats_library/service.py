@@ -0,0 +1,246 @@
+"""
+Service local d'analyse (asyncio, HTTP/JSON).
+
+Requêtes :
+
+- ``POST /analyse`` avec ``{"fichier": "data.csv", "methodes": ["moyenne", "correlation"]}``
+  retourne ``{"resultats": {"moyenne": 21.4, "correlation": 0.99}}`` ;
+- ``GET /sante`` retourne ``{"statut": "ok"}``.
+
+Les requêtes simultanées portant sur le même fichier sont regroupées
+pendant `delai_regroupement` secondes puis calculées en un seul passage
+fusionné (`PlanExecution`). Le chargement et le calcul s'exécutent dans
+un pool de processus : la boucle d'événements n'est jamais bloquée.
+Chaque requête est journalisée dans `JournalCalculs`. Les fichiers
+servis ne sont pas modifiés : le cache binaire ``.colonnes`` n'est
+écrit à côté des CSV que si le service est lancé avec `cache=True`
+(``--cache``).
+
+Lancement :
+    python -m stats_library.service --port 8765
+    python -m stats_library.service --socket /tmp/stats.sock
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from stats_library.core import JournalCalculs
+from stats_library.registre import REGISTRE
+from stats_library.strategies import analyser_fichier
+
+TAILLE_MAX_CORPS = 1024 * 1024
+STATUTS_HTTP = {200: "OK", 400: "Bad Request", 404: "Not Found",
+                405: "Method Not Allowed", 413: "Payload Too Large",
+                500: "Internal Server Error"}
+
+
+class ErreurRequete(Exception):
+    """Requête invalide : renvoyée au client avec le code HTTP donné."""
+
+    def __init__(self, message, code=400):
+        super().__init__(message)
+        self.code = code
+
+
+class ServiceAnalyse:
+    """Serveur HTTP/JSON regroupant les requêtes par fichier."""
+
+    def __init__(self, processus=None, delai_regroupement=0.005, racine=None, cache=False):
+        self.processus = processus
+        self.delai_regroupement = delai_regroupement
+        # Seuls les fichiers sous ce répertoire (par défaut, le répertoire
+        # courant) sont accessibles
+        self.racine = os.path.realpath(racine or os.getcwd())
+        # Écrire le cache binaire à côté des fichiers servis
+        self.cache = cache
+        self._journal = JournalCalculs()
+        self._pool = None
+        self._serveur = None
+        self._en_attente = {}  # fichier -> [(noms, future)]
+        self._taches = set()
+
+    def _creer_pool(self):
+        # « spawn » : des processus créés par fork hériteraient des sockets
+        # clientes ouvertes et empêcheraient leur fermeture
+        return ProcessPoolExecutor(max_workers=self.processus,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    async def demarrer(self, hote="127.0.0.1", port=8765, chemin_socket=None):
+        self._pool = self._creer_pool()
+        if chemin_socket:
+            self._serveur = await asyncio.start_unix_server(self._connexion, path=chemin_socket)
+        else:
+            self._serveur = await asyncio.start_server(self._connexion, hote, port)
+        return self._serveur
+
+    async def arreter(self):
+        if self._serveur is not None:
+            self._serveur.close()
+            await self._serveur.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def _resoudre(self, fichier):
+        chemin = os.path.realpath(os.path.join(self.racine, fichier))
+        if os.path.commonpath([self.racine, chemin]) != self.racine:
+            raise ErreurRequete(f"Fichier hors du répertoire autorisé : '{fichier}'")
+        if not os.path.isfile(chemin):
+            raise ErreurRequete(f"Fichier '{fichier}' introuvable", 404)
+        return chemin
+
+    async def analyser(self, fichier, noms):
+        """Résultats {nom: résultat} pour un fichier, via le regroupement."""
+        if not noms:
+            raise ErreurRequete("Aucune méthode demandée")
+        for nom in noms:
+            REGISTRE.obtenir(nom)  # valider avant de mettre en file
+        chemin = self._resoudre(fichier)
+        future = asyncio.get_running_loop().create_future()
+        lot = self._en_attente.setdefault(chemin, [])
+        lot.append((noms, future))
+        if len(lot) == 1:
+            tache = asyncio.get_running_loop().create_task(self._traiter_lot(chemin))
+            self._taches.add(tache)
+            tache.add_done_callback(self._taches.discard)
+        return await future
+
+    async def _traiter_lot(self, chemin):
+        await asyncio.sleep(self.delai_regroupement)
+        lot = self._en_attente.pop(chemin)
+        noms = list(dict.fromkeys(nom for noms_requete, _ in lot for nom in noms_requete))
+        debut = time.perf_counter()
+        code = 400
+        pool = self._pool
+        try:
+            _, resultats = await asyncio.get_running_loop().run_in_executor(
+                pool, analyser_fichier, chemin, noms, self.cache)
+        except ValueError as e:  # fichier sans données valides, etc.
+            resultats = {nom: (False, str(e)) for nom in noms}
+        except Exception as e:
+            # Erreur du serveur, pas de la requête
+            code = 500
+            resultats = {nom: (False, str(e) or type(e).__name__) for nom in noms}
+            if isinstance(e, BrokenProcessPool) and self._pool is pool:
+                # Un processus de travail est mort : le pool est inutilisable
+                self._pool = self._creer_pool()
+                pool.shutdown(wait=False)
+        duree = time.perf_counter() - debut
+        for noms_requete, future in lot:
+            for nom in noms_requete:
+                succes, valeur = resultats[nom]
+                self._journal.enregistrer(
+                    REGISTRE.obtenir(nom).classe.__name__,
+                    valeur,
+                    status="SUCCES" if succes else "ECHEC",
+                    duree_groupe=duree,
+                    fichier=chemin,
+                    lot=len(lot)
+                )
+            if future.done():
+                continue
+            erreurs = [resultats[nom][1] for nom in noms_requete if not resultats[nom][0]]
+            if erreurs:
+                future.set_exception(ErreurRequete("; ".join(erreurs), code))
+            else:
+                future.set_result({nom: resultats[nom][1] for nom in noms_requete})
+
+    async def _connexion(self, lecteur, ecrivain):
+        try:
+            code, reponse = await self._traiter_requete(lecteur)
+        except ErreurRequete as e:
+            code, reponse = e.code, {"erreur": str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            ecrivain.close()
+            return
+        except Exception as e:
+            code, reponse = 500, {"erreur": str(e)}
+        corps = json.dumps(reponse, ensure_ascii=False).encode("utf-8")
+        ecrivain.write(
+            f"HTTP/1.1 {code} {STATUTS_HTTP.get(code, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(corps)}\r\n"
+            f"Connection: close\r\n\r\n".encode("ascii") + corps)
+        try:
+            await ecrivain.drain()
+        finally:
+            ecrivain.close()
+
+    async def _traiter_requete(self, lecteur):
+        ligne = (await lecteur.readline()).decode("latin-1").split()
+        if len(ligne) < 2:
+            raise ErreurRequete("Requête HTTP invalide")
+        verbe, cible = ligne[0], ligne[1]
+        entetes = {}
+        while True:
+            entete = (await lecteur.readline()).decode("latin-1").strip()
+            if not entete:
+                break
+            nom, _, valeur = entete.partition(":")
+            entetes[nom.strip().lower()] = valeur.strip()
+
+        if cible == "/sante":
+            return 200, {"statut": "ok"}
+        if cible != "/analyse":
+            raise ErreurRequete(f"Ressource inconnue : {cible}", 404)
+        if verbe != "POST":
+            raise ErreurRequete("Utiliser POST", 405)
+
+        try:
+            longueur = int(entetes["content-length"])
+        except (KeyError, ValueError):
+            raise ErreurRequete("En-tête Content-Length absent ou invalide")
+        if longueur < 0:
+            raise ErreurRequete("En-tête Content-Length invalide")
+        if longueur > TAILLE_MAX_CORPS:
+            raise ErreurRequete("Corps de requête trop volumineux", 413)
+        try:
+            requete = json.loads(await lecteur.readexactly(longueur))
+            fichier, noms = requete["fichier"], requete["methodes"]
+            if not isinstance(fichier, str) or not isinstance(noms, list) \
+                    or not all(isinstance(nom, str) for nom in noms):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            raise ErreurRequete('Corps attendu : {"fichier": "...", "methodes": ["...", ...]}')
+        try:
+            return 200, {"resultats": await self.analyser(fichier, noms)}
+        except ValueError as e:
+            raise ErreurRequete(str(e))
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Service d'analyse statistique (HTTP/JSON)")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="écouter sur une socket Unix plutôt qu'en TCP")
+    parser.add_argument("--processus", type=int, default=None)
+    parser.add_argument("--delai", type=float, default=0.005,
+                        help="fenêtre de regroupement des requêtes, en secondes")
+    parser.add_argument("--racine", help="répertoire auquel l'accès aux fichiers est limité "
+                                         "(par défaut, le répertoire courant)")
+    parser.add_argument("--cache", action="store_true",
+                        help="écrire le cache binaire <fichier>.colonnes à côté des CSV servis")
+    options = parser.parse_args(arguments)
+
+    async def executer():
+        service = ServiceAnalyse(options.processus, options.delai, options.racine, options.cache)
+        serveur = await service.demarrer(options.hote, options.port, options.socket)
+        print(f"Service d'analyse à l'écoute sur {options.socket or f'{options.hote}:{options.port}'}")
+        try:
+            async with serveur:
+                await serveur.serve_forever()
+        finally:
+            await service.arreter()
+
+    try:
+        asyncio.run(executer())
+    except KeyboardInterrupt:
+        print("\nService arrêté.")
+
+
+if __name__ == "__main__":
+    main()
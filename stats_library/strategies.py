@@ -1,92 +1,851 @@
+import cProfile
+import io
+import itertools
 import math
+import os
+import pstats
+import random
+import time
+import tracemalloc
+from abc import abstractmethod
+from array import array
 from stats_library.core import MethodeStatistique, JournalCalculs
+from stats_library.accumulateurs import Gram, Moments
+from stats_library.annulation import executer_par_etapes
+from stats_library.rangs import Classement, Paires
+from stats_library.backends import choisir_backend
+from stats_library.algebre import cholesky, inverse_cholesky, resoudre_cholesky
+from stats_library.cache_resultats import CacheResultats
+from stats_library.donnees import extraire_colonnes, regrouper, taille_donnees
+from stats_library.chargement import (
+    analyser_csv_parallele,
+    charger_csv,
+    charger_csv_parallele,
+    lire_csv_par_blocs
+)
+from stats_library.echantillonnage import TAILLE_ECHANTILLON, echantillonner_csv, erreur_type
+from stats_library.incremental import analyser_csv_incremental
+from stats_library.registre import methode_par_nom
+from stats_library.quantiles import CroquisKLL, quantiles_exacts
+
+class MethodeParMoments(MethodeStatistique):
+    """Méthode déduite d'un accumulateur `Moments` (calcul en flux et fusionnable)."""
+    flux = True
+    fusionnable = True
 
-class Moyenne(MethodeStatistique):
     def calculer(self, donnees):
-        if not donnees: return 0
-        return sum(donnees) / len(donnees)
+        return self.finaliser(self.mettre_a_jour(self.initialiser(), donnees))
+
+    def initialiser(self):
+        return Moments()
+
+    def mettre_a_jour(self, etat, bloc):
+        return etat.ajouter_colonnes(*extraire_colonnes(bloc, self.dimension))
+
+    def fusionner(self, etat, autre_etat):
+        return etat.fusionner(autre_etat)
 
-class Mediane(MethodeStatistique):
+    @abstractmethod
+    def finaliser(self, etat):
+        pass
+
+class Moyenne(MethodeParMoments):
     def calculer(self, donnees):
-        if not donnees: return 0
-        sorted_data = sorted(donnees)
-        n = len(sorted_data)
-        mid = n // 2
-        if n % 2 == 0:
-            return (sorted_data[mid-1] + sorted_data[mid]) / 2
-        else:
-            return sorted_data[mid]
+        x, = extraire_colonnes(donnees, 1)
+        if not len(x): return 0
+        return choisir_backend(x).somme(x) / len(x)
+
+    def finaliser(self, etat):
+        if not etat.n: return 0
+        return etat.moyenne_x
+
+class Quantile(MethodeStatistique):
+    """
+    Quantile(s) d'ordre p, par sélection (sans tri complet).
+
+    `probabilites` est un nombre (résultat : un nombre) ou une liste
+    (résultat : un tuple, tous les quantiles en un seul appel). En mode
+    `approximatif`, un croquis KLL de paramètre `k` borne la mémoire.
+    """
+    # Le mode exact conserve les valeurs : fusionnable, mais pas en
+    # mémoire bornée (voir `flux`)
+    fusionnable = True
+
+    def __init__(self, probabilites, approximatif=False, k=200):
+        self._scalaire = not isinstance(probabilites, (list, tuple))
+        self.probabilites = [probabilites] if self._scalaire else list(probabilites)
+        self.approximatif = approximatif
+        self.k = k
+
+    @property
+    def flux(self):
+        return self.approximatif
+
+    @property
+    def deterministe(self):
+        # Le croquis KLL compacte au hasard
+        return not self.approximatif
+
+    def parametres(self):
+        return (("probabilites", tuple(self.probabilites)), ("scalaire", self._scalaire),
+                ("approximatif", self.approximatif), ("k", self.k))
+
+    def _resultat(self, valeurs):
+        return valeurs[0] if self._scalaire else tuple(valeurs)
 
-class EcartType(MethodeStatistique):
     def calculer(self, donnees):
-        if len(donnees) < 2: return 0
-        avg = sum(donnees) / len(donnees)
-        variance = sum((x - avg)**2 for x in donnees) / (len(donnees) - 1)
-        return math.sqrt(variance)
+        x, = extraire_colonnes(donnees, 1)
+        if self.approximatif:
+            return self.finaliser(self.mettre_a_jour(self.initialiser(), x))
+        if not len(x): return self._resultat([0] * len(self.probabilites))
+        return self._resultat(quantiles_exacts(x, self.probabilites))
 
-class Correlation(MethodeStatistique):
+    def initialiser(self):
+        if self.approximatif:
+            return CroquisKLL(self.k)
+        # Mode exact : les valeurs sont conservées (mémoire O(n))
+        return array('d')
+
+    def mettre_a_jour(self, etat, bloc):
+        x, = extraire_colonnes(bloc, 1)
+        if self.approximatif:
+            return etat.ajouter(x)
+        etat.extend(x)
+        return etat
+
+    def fusionner(self, etat, autre_etat):
+        if self.approximatif:
+            return etat.fusionner(autre_etat)
+        etat.extend(autre_etat)
+        return etat
+
+    def finaliser(self, etat):
+        if not len(etat): return self._resultat([0] * len(self.probabilites))
+        if self.approximatif:
+            return self._resultat(etat.quantiles(self.probabilites))
+        return self._resultat(quantiles_exacts(etat, self.probabilites))
+
+class Mediane(Quantile):
+    def __init__(self, approximatif=False, k=200):
+        super().__init__(0.5, approximatif=approximatif, k=k)
+
+class EcartType(MethodeParMoments):
+    def finaliser(self, etat):
+        if etat.n < 2: return 0
+        return math.sqrt(etat.m2_x / (etat.n - 1))
+
+class Correlation(MethodeParMoments):
     """Corrélation entre 2 listes de valeurs."""
+    dimension = 2
+
     def calculer(self, donnees):
         if len(donnees) < 2: return 0
-        try:
-            x = [d[0] for d in donnees]
-            y = [d[1] for d in donnees]
-        except (TypeError, IndexError):
-            raise ValueError("Les données doivent être des tuples (x, y)")
-        n = len(donnees)
-
-        sum_x = sum(x)
-        sum_y = sum(y)
-        sum_xy = sum(xi*yi for xi, yi in zip(x, y))
-        sum_x2 = sum(xi**2 for xi in x)
-        sum_y2 = sum(yi**2 for yi in y)
-
-        numerator = n*sum_xy - sum_x*sum_y
-        denominator = math.sqrt((n*sum_x2 - sum_x**2)*(n*sum_y2 - sum_y**2))
+        return super().calculer(donnees)
+
+    def finaliser(self, etat):
+        if etat.n < 2: return 0
+        denominator = math.sqrt(etat.m2_x * etat.m2_y)
         if denominator == 0: return 0
-        return numerator / denominator
+        return etat.c_xy / denominator
 
-class RegressionLineaire(MethodeStatistique):
+class RegressionLineaire(MethodeParMoments):
     """Régression Linéaire (retourne pente, intercept)."""
+    dimension = 2
+
     def calculer(self, donnees):
         if len(donnees) < 2: return (0,0)
-        try:
-            x = [d[0] for d in donnees]
-            y = [d[1] for d in donnees]
-        except (TypeError, IndexError):
-            raise ValueError("Les données doivent être des tuples (x, y)")
-        n = len(donnees)
-
-        sum_x = sum(x)
-        sum_y = sum(y)
-        sum_xy = sum(xi*yi for xi, yi in zip(x, y))
-        sum_x2 = sum(xi**2 for xi in x)
-
-        denominator = n*sum_x2 - sum_x**2
-        if denominator == 0:
-            return (0, sum_y/n)
-
-        slope = (n*sum_xy - sum_x*sum_y) / denominator
-        intercept = (sum_y - slope*sum_x) / n
+        return super().calculer(donnees)
+
+    def finaliser(self, etat):
+        if etat.n < 2: return (0,0)
+        if etat.m2_x == 0:
+            return (0, etat.moyenne_y)
+
+        slope = etat.c_xy / etat.m2_x
+        intercept = etat.moyenne_y - slope*etat.moyenne_x
         return slope, intercept
 
+class MethodeParRangs(MethodeStatistique):
+    """
+    Méthode déduite d'un `Classement` des paires (x, y) : rangs moyens et
+    comptes de Knight, obtenus par un tri par variable (le compte des
+    échanges, en O(n log² n), n'est fait que pour Kendall). Les valeurs sont
+    conservées (mémoire O(n)) : fusionnable, mais pas en flux.
+    """
+    dimension = 2
+    fusionnable = True
+    cout = "O(n log n)"
+
+    def calculer(self, donnees):
+        if len(donnees) < 2: return 0
+        return self.finaliser_classement(Classement.depuis_colonnes(*extraire_colonnes(donnees, 2)))
+
+    def initialiser(self):
+        return Paires()
+
+    def mettre_a_jour(self, etat, bloc):
+        return etat.ajouter_colonnes(*extraire_colonnes(bloc, 2))
+
+    def fusionner(self, etat, autre_etat):
+        return etat.fusionner(autre_etat)
+
+    def finaliser(self, etat):
+        return self.finaliser_classement(etat.classement())
+
+    @abstractmethod
+    def finaliser_classement(self, classement):
+        pass
+
+class Spearman(MethodeParRangs):
+    """Corrélation de Spearman : corrélation de Pearson des rangs moyens."""
+
+    def finaliser_classement(self, classement):
+        if classement.n < 2: return 0
+        moments = Moments.depuis_colonnes(classement.rangs_x, classement.rangs_y)
+        denominator = math.sqrt(moments.m2_x * moments.m2_y)
+        if denominator == 0: return 0
+        return moments.c_xy / denominator
+
+class Kendall(MethodeParRangs):
+    """
+    Tau-b de Kendall, ex aequo compris, en O(n log² n) (algorithme de
+    Knight, voir `stats_library.rangs`).
+    """
+    cout = "O(n log² n)"
+
+    def finaliser_classement(self, classement):
+        paires = classement.n * (classement.n - 1) // 2
+        denominator = math.sqrt((paires - classement.liens_x) * (paires - classement.liens_y))
+        if denominator == 0: return 0
+        concordance = (paires - classement.liens_x - classement.liens_y + classement.liens_xy
+                       - 2 * classement.echanges)
+        return concordance / denominator
+
+class MethodeParGram(MethodeStatistique):
+    """
+    Méthode déduite d'un accumulateur `Gram` sur toutes les colonnes
+    (calcul en flux et fusionnable).
+    """
+    dimension = 2
+    flux = True
+    fusionnable = True
+    cout = "O(n·k²)"
+    # Les données doivent être chargées avec toutes leurs colonnes
+    toutes_colonnes = True
+
+    def calculer(self, donnees):
+        return self.finaliser(self.mettre_a_jour(self.initialiser(), donnees))
+
+    def initialiser(self):
+        return Gram()
+
+    def mettre_a_jour(self, etat, bloc):
+        return etat.ajouter_colonnes(extraire_colonnes(bloc))
+
+    def fusionner(self, etat, autre_etat):
+        return etat.fusionner(autre_etat)
+
+    @abstractmethod
+    def finaliser(self, etat):
+        pass
+
+class MatriceCovariance(MethodeParGram):
+    """Matrice de covariance (n-1) de toutes les colonnes, en un passage."""
+
+    def finaliser(self, etat):
+        if etat.n < 2:
+            return tuple(tuple(0.0 for _ in ligne) for ligne in etat.co)
+        return tuple(tuple(c / (etat.n - 1) for c in ligne) for ligne in etat.co)
+
+class MatriceCorrelation(MatriceCovariance):
+    """Matrice des corrélations de Pearson entre toutes les colonnes."""
+
+    def finaliser(self, etat):
+        ecarts = [math.sqrt(etat.co[i][i]) for i in range(etat.k)]
+        return tuple(
+            tuple((1.0 if i == j else c / (ecarts[i] * ecarts[j])) if ecarts[i] * ecarts[j] else 0
+                  for j, c in enumerate(ligne))
+            for i, ligne in enumerate(etat.co)
+        )
+
+class RegressionMultiple(MethodeParGram):
+    """
+    Régression linéaire multiple par moindres carrés : la dernière
+    colonne est expliquée par les précédentes.
+
+    Les équations normales sont accumulées sous forme centrée (matrice
+    `Gram`, coût lignes × variables²) puis résolues par Cholesky.
+    Retourne un dictionnaire : `coefficients` et `erreurs_types`
+    (constante en premier), `r2` et `n`.
+    """
+
+    def finaliser(self, etat):
+        p = etat.k - 1
+        if p < 1:
+            raise ValueError("Au moins une variable explicative et une cible sont requises")
+        if etat.n < p + 2:
+            raise ValueError(f"Au moins {p + 2} observations sont requises")
+        sxx = [ligne[:p] for ligne in etat.co[:p]]
+        sxy = [ligne[p] for ligne in etat.co[:p]]
+        syy = etat.co[p][p]
+        l = cholesky(sxx)
+        beta = resoudre_cholesky(l, sxy)
+        x_moyen, y_moyen = etat.moyennes[:p], etat.moyennes[p]
+        intercept = y_moyen - math.fsum(b * m for b, m in zip(beta, x_moyen))
+
+        residus = max(0.0, syy - math.fsum(b * c for b, c in zip(beta, sxy)))
+        r2 = 1 - residus / syy if syy else 1.0
+        variance = residus / (etat.n - p - 1)
+        inverse = inverse_cholesky(l)
+        erreurs = [math.sqrt(variance * inverse[i][i]) for i in range(p)]
+        terme = math.fsum(x_moyen[i] * inverse[i][j] * x_moyen[j]
+                          for i in range(p) for j in range(p))
+        erreur_intercept = math.sqrt(variance * (1 / etat.n + terme))
+        return {
+            "coefficients": (intercept, *beta),
+            "erreurs_types": (erreur_intercept, *erreurs),
+            "r2": r2,
+            "n": etat.n,
+        }
+
+def _profiler(fonction, donnees, lignes_profil=15):
+    """Exécute `fonction(donnees)` sous cProfile et tracemalloc."""
+    profil = cProfile.Profile()
+    suivi_actif = tracemalloc.is_tracing()
+    if not suivi_actif:
+        tracemalloc.start()
+    elif hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+        tracemalloc.reset_peak()
+    try:
+        resultat = profil.runcall(fonction, donnees)
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        if not suivi_actif:
+            tracemalloc.stop()
+    sortie = io.StringIO()
+    pstats.Stats(profil, stream=sortie).sort_stats("cumulative").print_stats(lignes_profil)
+    return resultat, {"profil": sortie.getvalue(), "memoire_pic": pic}
+
+class PlanExecution:
+    """
+    Regroupe plusieurs méthodes pour les calculer en un seul passage.
+
+    Les méthodes déduites des moments (`MethodeParMoments`) partagent un
+    même accumulateur, et les méthodes de rang (`MethodeParRangs`) un
+    même classement (un seul tri) ; les autres gardent leur propre état.
+    Le plan suit lui-même le protocole incrémental, ce qui permet de
+    calculer des états partiels par bloc ou par processus puis de les
+    fusionner.
+    """
+    def __init__(self, methodes):
+        self.methodes = list(methodes)
+        self._autres = [m for m in self.methodes
+                        if not isinstance(m, (MethodeParMoments, MethodeParRangs))]
+        self.dimension_moments = max(
+            (m.dimension for m in self.methodes if isinstance(m, MethodeParMoments)),
+            default=0
+        )
+        self.rangs = any(isinstance(m, MethodeParRangs) for m in self.methodes)
+
+    def _moments(self, donnees):
+        return Moments.depuis_colonnes(*extraire_colonnes(donnees, self.dimension_moments))
+
+    def calculer(self, donnees):
+        """Résultats de chaque méthode, dans l'ordre, sur des données en mémoire."""
+        moments = self._moments(donnees) if self.dimension_moments else None
+        classement = (Classement.depuis_colonnes(*extraire_colonnes(donnees, 2))
+                      if self.rangs else None)
+        resultats = []
+        for m in self.methodes:
+            if isinstance(m, MethodeParMoments):
+                resultats.append(m.finaliser(moments))
+            elif isinstance(m, MethodeParRangs):
+                resultats.append(m.finaliser_classement(classement))
+            else:
+                resultats.append(m.calculer(donnees))
+        return resultats
+
+    def initialiser(self):
+        moments = Moments() if self.dimension_moments else None
+        paires = Paires() if self.rangs else None
+        return (moments, paires, [m.initialiser() for m in self._autres])
+
+    def mettre_a_jour(self, etat, bloc):
+        moments, paires, autres = etat
+        if moments is not None:
+            moments.ajouter_colonnes(*extraire_colonnes(bloc, self.dimension_moments))
+        if paires is not None:
+            paires.ajouter_colonnes(*extraire_colonnes(bloc, 2))
+        autres = [m.mettre_a_jour(e, bloc) for m, e in zip(self._autres, autres)]
+        return (moments, paires, autres)
+
+    def fusionner(self, etat, autre_etat):
+        moments, paires, autres = etat
+        if moments is not None:
+            moments.fusionner(autre_etat[0])
+        if paires is not None:
+            paires.fusionner(autre_etat[1])
+        autres = [m.fusionner(e, a) for m, e, a in zip(self._autres, autres, autre_etat[2])]
+        return (moments, paires, autres)
+
+    def _etats(self, etat):
+        """État de chaque méthode : l'accumulateur partagé ou son propre état."""
+        moments, paires, autres = etat
+        etats = iter(autres)
+        for m in self.methodes:
+            if isinstance(m, MethodeParMoments):
+                yield moments
+            elif isinstance(m, MethodeParRangs):
+                yield paires
+            else:
+                yield next(etats)
+
+    def finaliser(self, etat):
+        return [m.finaliser(e) for m, e in zip(self.methodes, self._etats(etat))]
+
+    def finaliser_chacune(self, etat):
+        """
+        Comme `finaliser`, mais retourne (True, résultat) ou (False,
+        message) par méthode : une erreur n'empêche pas les autres.
+        """
+        resultats = []
+        for m, etat_methode in zip(self.methodes, self._etats(etat)):
+            try:
+                resultats.append((True, m.finaliser(etat_methode)))
+            except ValueError as e:
+                resultats.append((False, str(e)))
+        return resultats
+
 class Analyseur:
-    """Classe principale qui utilise la stratégie choisie."""
-    def __init__(self, methode: MethodeStatistique = None):
+    """
+    Classe principale qui utilise la stratégie choisie.
+
+    Avec un `CacheResultats`, un calcul déjà fait sur les mêmes données
+    avec la même méthode et les mêmes paramètres n'est pas refait ; il
+    est journalisé avec le statut "CACHE".
+    """
+    def __init__(self, methode: MethodeStatistique = None, cache: CacheResultats = None):
         self._methode = methode
         self._journal = JournalCalculs()
+        self._cache = cache
+        self._crochets_avant = []
+        self._crochets_apres = []
 
     def set_methode(self, methode: MethodeStatistique):
         self._methode = methode
 
-    def executer_analyse(self, donnees):
+    def ajouter_crochet(self, avant=None, apres=None):
+        """
+        Ajoute des fonctions appelées autour de chaque `executer` :
+        `avant(methode, donnees)` et `apres(methode, donnees, resultat, mesures)`,
+        où `mesures` contient les détails enregistrés dans le journal.
+        """
+        if avant is not None:
+            self._crochets_avant.append(avant)
+        if apres is not None:
+            self._crochets_apres.append(apres)
+
+    def executer_analyse(self, donnees, profiler=False, progression=None, jeton=None):
+        if self._methode is None:
+            raise ValueError("Aucune méthode définie")
+        return self.executer(self._methode, donnees, profiler=profiler,
+                             progression=progression, jeton=jeton)
+
+    def executer(self, methode, donnees, profiler=False, progression=None, jeton=None):
+        """
+        Exécute `methode` sur `donnees` sans modifier l'analyseur.
+
+        Ce chemin ne lit ni n'écrit la méthode courante : un même
+        analyseur peut être partagé entre fils d'exécution.
+
+        L'entrée du journal reçoit les durées réelle (`duree`) et CPU
+        (`duree_cpu`) en secondes, et le nombre de lignes et d'octets
+        lus. Avec `profiler=True`, le calcul passe sous cProfile et
+        tracemalloc : les fonctions les plus coûteuses (`profil`) et la
+        mémoire de pointe (`memoire_pic`) sont ajoutées à l'entrée.
+
+        Avec `progression` (appelée avec les lignes traitées et le total)
+        ou un `JetonAnnulation`, le calcul est mené par blocs de lignes
+        (voir `stats_library.annulation`). Si le jeton est annulé ou
+        expire, le calcul s'arrête entre deux blocs et retourne un
+        résultat partiel (None si la méthode ne le permet pas), journalisé
+        avec le statut "ANNULE" ou "EXPIRE" et les lignes traitées.
+        """
+        lignes, octets = taille_donnees(donnees)
+        mesures = {"lignes": lignes, "octets": octets}
+        for crochet in self._crochets_avant:
+            crochet(methode, donnees)
+
+        if self._cache is not None:
+            cle = self._cache.cle(methode, donnees)
+            trouve, resultat = self._cache.obtenir(cle)
+            if trouve:
+                self._journal.enregistrer(
+                    methode.__class__.__name__,
+                    resultat,
+                    status="CACHE",
+                    **mesures
+                )
+                for crochet in self._crochets_apres:
+                    crochet(methode, donnees, resultat, mesures)
+                return resultat
+
+        if progression is not None or jeton is not None:
+            def calculer(donnees):
+                return executer_par_etapes(methode, donnees, progression, jeton)
+        else:
+            def calculer(donnees):
+                return methode.calculer(donnees), None, lignes
+
+        debut, debut_cpu = time.perf_counter(), time.process_time()
+        if profiler:
+            (resultat, statut, traitees), profil = _profiler(calculer, donnees)
+            mesures.update(profil)
+        else:
+            resultat, statut, traitees = calculer(donnees)
+        mesures["duree"] = time.perf_counter() - debut
+        mesures["duree_cpu"] = time.process_time() - debut_cpu
+
+        if statut is not None:
+            # Calcul interrompu : ni mis en cache, ni compté comme réussi
+            mesures.update(lignes=traitees, lignes_totales=lignes, partiel=resultat is not None,
+                           octets=octets * traitees // lignes if lignes else 0)
+        elif self._cache is not None:
+            self._cache.stocker(cle, resultat)
+        self._journal.enregistrer(
+            methode.__class__.__name__,
+            resultat,
+            status=statut or "SUCCES",
+            **mesures
+        )
+        for crochet in self._crochets_apres:
+            crochet(methode, donnees, resultat, mesures)
+        return resultat
+
+    def executer_par_blocs(self, blocs, progression=None, jeton=None):
+        """
+        Exécute la méthode courante sur une suite de blocs de données.
+
+        Seul l'état de la méthode est conservé en mémoire : un fichier
+        plus grand que la RAM peut être traité bloc par bloc (voir
+        `stats_library.chargement.lire_csv_par_blocs`).
+
+        `progression(lignes_traitees, None)` est appelée après chaque
+        bloc (le total n'est pas connu). Avec un `JetonAnnulation`, la
+        lecture s'arrête au bloc suivant l'annulation ou l'échéance ; le
+        résultat, partiel, est journalisé avec le statut "ANNULE" ou
+        "EXPIRE".
+        """
         if self._methode is None:
             raise ValueError("Aucune méthode définie")
 
-        resultat = self._methode.calculer(donnees)
+        debut, debut_cpu = time.perf_counter(), time.process_time()
+        lignes = octets = 0
+        statut = None
+        etat = self._methode.initialiser()
+        for bloc in blocs:
+            statut = jeton.statut if jeton is not None else None
+            if statut is not None:
+                break
+            etat = self._methode.mettre_a_jour(etat, bloc)
+            n, taille = taille_donnees(bloc)
+            lignes += n
+            octets += taille
+            if progression is not None:
+                progression(lignes, None)
+        details = {}
+        if statut is None:
+            resultat = self._methode.finaliser(etat)
+        else:
+            try:
+                resultat = self._methode.finaliser(etat) if lignes else None
+            except ValueError:  # pas assez de lignes pour un résultat partiel
+                resultat = None
+            details["partiel"] = resultat is not None
         self._journal.enregistrer(
             self._methode.__class__.__name__,
             resultat,
-            status="SUCCES"
+            status=statut or "SUCCES",
+            duree=time.perf_counter() - debut,
+            duree_cpu=time.process_time() - debut_cpu,
+            lignes=lignes,
+            octets=octets,
+            **details
         )
         return resultat
+
+    def executer_plusieurs(self, methodes, donnees):
+        """
+        Exécute plusieurs méthodes en un seul passage sur les données.
+
+        Voir `PlanExecution`. Seules les méthodes absentes du cache
+        sont calculées. Chaque résultat est journalisé.
+        """
+        methodes = list(methodes)
+        lignes, octets = taille_donnees(donnees)
+        debut = time.perf_counter()
+        if self._cache is None:
+            resultats = PlanExecution(methodes).calculer(donnees)
+            self._journaliser(methodes, resultats, duree_groupe=time.perf_counter() - debut,
+                              lignes=lignes, octets=octets)
+            return resultats
+
+        cles = [self._cache.cle(m, donnees) for m in methodes]
+        trouves = [self._cache.obtenir(cle) for cle in cles]
+        a_calculer = [m for m, (trouve, _) in zip(methodes, trouves) if not trouve]
+        calcules = iter(PlanExecution(a_calculer).calculer(donnees) if a_calculer else [])
+
+        resultats = []
+        for methode, cle, (trouve, resultat) in zip(methodes, cles, trouves):
+            if not trouve:
+                resultat = next(calcules)
+                self._cache.stocker(cle, resultat)
+            self._journal.enregistrer(
+                methode.__class__.__name__,
+                resultat,
+                status="CACHE" if trouve else "SUCCES",
+                duree_groupe=time.perf_counter() - debut,
+                lignes=lignes,
+                octets=octets
+            )
+            resultats.append(resultat)
+        return resultats
+
+    def executer_par_groupe(self, methodes, donnees, cles=None):
+        """
+        Exécute plusieurs méthodes pour chaque groupe de lignes.
+
+        Les lignes sont partitionnées par clé en un seul passage (voir
+        `regrouper`), puis chaque groupe est calculé en un passage fusionné
+        (`PlanExecution`) ; les médianes et quantiles utilisent une
+        sélection par groupe. Retourne {clé: [résultats des méthodes]}.
+        Le journal reçoit une entrée par méthode, dont le résultat est le
+        dict {clé: résultat}.
+        """
+        methodes = list(methodes)
+        lignes, octets = taille_donnees(donnees)
+        debut = time.perf_counter()
+        plan = PlanExecution(methodes)
+        resultats = {cle: plan.calculer(groupe)
+                     for cle, groupe in regrouper(donnees, cles).items()}
+        duree = time.perf_counter() - debut
+        for i, methode in enumerate(methodes):
+            self._journal.enregistrer(
+                methode.__class__.__name__,
+                {cle: valeurs[i] for cle, valeurs in resultats.items()},
+                status="SUCCES",
+                duree_groupe=duree,
+                lignes=lignes,
+                octets=octets,
+                groupes=len(resultats)
+            )
+        return resultats
+
+    def executer_fichier(self, methodes, chemin, processus=None):
+        """
+        Exécute plusieurs méthodes sur un fichier CSV, en parallèle.
+
+        Si toutes les méthodes sont fusionnables, le fichier est découpé
+        en plages d'octets analysées par un pool de processus ; chaque
+        processus retourne un état partiel, et les états sont fusionnés
+        ici (voir `analyser_csv_parallele`). Sinon, le fichier est chargé
+        en parallèle puis calculé en un passage fusionné.
+        """
+        methodes = list(methodes)
+        plan = PlanExecution(methodes)
+        largeur_max = None if any(m.toutes_colonnes for m in methodes) else 2
+        debut = time.perf_counter()
+        if all(m.fusionnable for m in methodes):
+            etat = analyser_csv_parallele(chemin, plan, processus, largeur_max=largeur_max)
+            resultats = plan.finaliser(etat)
+        else:
+            donnees = charger_csv_parallele(chemin, processus, largeur_max=largeur_max)
+            resultats = plan.calculer(donnees)
+        self._journaliser(methodes, resultats, duree_groupe=time.perf_counter() - debut,
+                          octets=os.path.getsize(chemin))
+        return resultats
+
+    def executer_incremental(self, methodes, chemin):
+        """
+        Exécute plusieurs méthodes sur un fichier CSV en ajout seul, en ne
+        lisant que les lignes ajoutées depuis l'appel précédent (voir
+        `stats_library.incremental`). Les méthodes doivent être
+        fusionnables.
+        """
+        methodes = list(methodes)
+        for methode in methodes:
+            if not methode.fusionnable:
+                raise ValueError(f"{methode.__class__.__name__} ne supporte pas le calcul incrémental")
+        plan = PlanExecution(methodes)
+        largeur_max = None if any(m.toutes_colonnes for m in methodes) else 2
+        debut = time.perf_counter()
+        etat, infos = analyser_csv_incremental(chemin, plan, largeur_max=largeur_max)
+        resultats = plan.finaliser(etat)
+        self._journaliser(methodes, resultats, duree_groupe=time.perf_counter() - debut,
+                          lignes_nouvelles=infos["lignes_nouvelles"],
+                          recalcul_complet=infos["recalcul_complet"])
+        return resultats
+
+    def executer_approximatif(self, methodes, chemin, precision=None, budget=None,
+                              taille=TAILLE_ECHANTILLON, mode="positions", graine=None,
+                              echantillon=None):
+        """
+        Exécute plusieurs méthodes sur un échantillon d'un fichier CSV
+        (voir `stats_library.echantillonnage`), pour une réponse rapide
+        sur un gros fichier.
+
+        Chaque résultat est accompagné de son erreur type (bootstrap).
+        Avec `precision`, l'échantillon est agrandi jusqu'à ce que
+        l'erreur type de chaque résultat soit au plus `precision` ; avec
+        `budget` (secondes), il est agrandi tant que le tour suivant
+        tient dans le budget. Sans l'un ni l'autre, un seul échantillon
+        de `taille` lignes est tiré. `echantillon`, couple (données,
+        informations) déjà retourné par `echantillonner_csv`, est analysé
+        au premier tour à la place d'un nouveau tirage : les lignes
+        analysées sont alors celles que l'appelant a sous les yeux.
+
+        Retourne une liste de dicts (`resultat`, `erreur_type`,
+        `taille_echantillon`, `lignes_estimees`, `exact`). Le journal
+        note `approximatif`, la taille de l'échantillon et l'erreur type.
+        """
+        methodes = list(methodes)
+        plan = PlanExecution(methodes)
+        largeur_max = None if any(m.toutes_colonnes for m in methodes) else 2
+        aleatoire = random.Random(graine)
+        debut = time.perf_counter()
+        echeance = debut + budget if budget is not None else None
+        while True:
+            tour = time.perf_counter()
+            restant = echeance - tour if echeance is not None else None
+            if echantillon is not None:
+                (donnees, infos), echantillon = echantillon, None
+                taille = infos["taille_echantillon"]
+            else:
+                donnees, infos = echantillonner_csv(chemin, taille, mode,
+                                                    graine=aleatoire.getrandbits(64),
+                                                    budget=restant, largeur_max=largeur_max)
+            resultats = plan.calculer(donnees)
+            erreurs = [erreur_type(m, donnees, r, infos["lignes_estimees"],
+                                   graine=aleatoire.getrandbits(64))
+                       for m, r in zip(methodes, resultats)]
+            if infos["complet"] or infos["interrompu"]:
+                break
+            pire = max((max(e) if isinstance(e, tuple) else e
+                        for e in erreurs if e is not None), default=0.0)
+            if precision is not None:
+                if pire <= precision:
+                    break
+                # L'erreur type décroît en 1/√n
+                facteur = min(16.0, max(2.0, 1.1 * (pire / precision) ** 2))
+            elif budget is not None:
+                facteur = 2.0
+            else:
+                break
+            if echeance is not None:
+                # Le temps d'un tour croît avec la taille de l'échantillon
+                maintenant = time.perf_counter()
+                facteur = min(facteur, (echeance - maintenant) / max(maintenant - tour, 1e-9))
+                if facteur < 1.5:
+                    break
+            taille = int(taille * facteur)
+
+        sortie = []
+        for methode, resultat, erreur in zip(methodes, resultats, erreurs):
+            self._journal.enregistrer(
+                methode.__class__.__name__,
+                resultat,
+                status="SUCCES",
+                duree_groupe=time.perf_counter() - debut,
+                lignes=infos["taille_echantillon"],
+                approximatif=not infos["complet"],
+                taille_echantillon=infos["taille_echantillon"],
+                lignes_estimees=infos["lignes_estimees"],
+                erreur_type=erreur,
+                echantillonnage=infos["mode"]
+            )
+            sortie.append({
+                "resultat": resultat,
+                "erreur_type": erreur,
+                "taille_echantillon": infos["taille_echantillon"],
+                "lignes_estimees": infos["lignes_estimees"],
+                "exact": infos["complet"],
+            })
+        return sortie
+
+    def _journaliser(self, methodes, resultats, **details):
+        # Passage commun à plusieurs méthodes : la durée (`duree_groupe`)
+        # est celle du groupe, elle n'entre pas dans les latences par méthode
+        for methode, resultat in zip(methodes, resultats):
+            self._journal.enregistrer(
+                methode.__class__.__name__,
+                resultat,
+                status="SUCCES",
+                **details
+            )
+
+
+# Au-delà de cette taille, un fichier est lu en flux (mémoire bornée)
+# si toutes les méthodes demandées le permettent
+SEUIL_FLUX = 256 * 1024 * 1024
+
+
+def analyser_fichier(chemin, noms, cache=True, incremental=False):
+    """
+    Applique les méthodes nommées (voir `stats_library.registre`) à un
+    fichier CSV, en un seul passage fusionné.
+
+    Le plan d'exécution suit les capacités déclarées : toutes les
+    colonnes ne sont lues que si une méthode les utilise, et un gros
+    fichier est lu en flux plutôt que chargé en mémoire quand toutes
+    les méthodes le permettent.
+
+    Retourne (lignes, {nom: (True, résultat) ou (False, message)}) : une
+    méthode inapplicable (ex. corrélation sur une colonne) ne fait pas
+    échouer les autres. Utilisée par le service et la ligne de commande,
+    y compris dans des processus de travail.
+
+    Avec `incremental=True`, seules les lignes ajoutées depuis l'appel
+    précédent sont lues (voir `stats_library.incremental`).
+    """
+    methodes = {nom: methode_par_nom(nom) for nom in noms}
+    largeur_max = None if any(m.toutes_colonnes for m in methodes.values()) else 2
+    if incremental:
+        plan = PlanExecution([methodes[nom] for nom in noms])
+        etat, infos = analyser_csv_incremental(chemin, plan, largeur_max=largeur_max)
+        return infos["lignes"], dict(zip(noms, plan.finaliser_chacune(etat)))
+    en_flux = (all(m.flux for m in methodes.values())
+               and os.path.getsize(chemin) >= SEUIL_FLUX)
+    if en_flux:
+        blocs = lire_csv_par_blocs(chemin, largeur_max=largeur_max)
+        premier = next(blocs, None)
+        if premier is None:
+            raise ValueError("Aucune donnée valide trouvée dans le fichier.")
+        largeur = premier.largeur
+        blocs = itertools.chain([premier], blocs)
+    else:
+        donnees = charger_csv(chemin, cache=cache, largeur_max=largeur_max)
+        largeur = donnees.largeur
+
+    sortie = {nom: (False, f"{type(m).__name__} requiert {m.dimension} colonnes")
+              for nom, m in methodes.items() if m.dimension > largeur}
+    retenues = [nom for nom in noms if nom not in sortie]
+    plan = PlanExecution([methodes[nom] for nom in retenues])
+
+    if en_flux:
+        etat, lignes = plan.initialiser(), 0
+        for bloc in blocs:
+            etat = plan.mettre_a_jour(etat, bloc)
+            lignes += len(bloc)
+        sortie.update(zip(retenues, plan.finaliser_chacune(etat)))
+        return lignes, sortie
+
+    try:
+        sortie.update((nom, (True, r)) for nom, r in zip(retenues, plan.calculer(donnees)))
+    except ValueError:
+        # Une méthode a échoué (ex. matrice singulière) : isoler l'erreur
+        for nom in retenues:
+            try:
+                sortie[nom] = (True, methodes[nom].calculer(donnees))
+            except ValueError as e:
+                sortie[nom] = (False, str(e))
+    return len(donnees), sortie